@@ -4,29 +4,33 @@ Handles user login, registration, and token management.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import select, exists, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.models import User, UserRole
+from app.core.database import get_db, get_by_id
+from app.models import User, UserRole, Tenant
 from app.schemas import UserCreate, UserLogin, Token, User as UserSchema
-from app.core.security import SecurityService, get_current_user, get_current_admin
+from app.core.security import SecurityService, get_current_user, get_current_admin, cache_user
 from app.core.exceptions import UnauthorizedError, ConflictError
 from app.core.tenant import get_tenant_from_subdomain
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+# Statements for fixed query shapes, built once at import
+_EMAIL_EXISTS = select(exists().where(User.email == bindparam("email")))
+
 
 @router.post("/login", response_model=Token)
 async def login(
     user_login: UserLogin,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Authenticate user and return JWT tokens with tenant validation."""
     # Get current tenant from subdomain (if any)
     current_tenant = await get_tenant_from_subdomain(request, db)
     
-    user = SecurityService.authenticate_user(db, user_login.email, user_login.password)
+    user = await SecurityService.authenticate_user(db, user_login.email, user_login.password)
     if not user:
         raise UnauthorizedError("Incorrect email or password")
     
@@ -51,14 +55,16 @@ async def login(
         else:
             # Regular users should be redirected to their tenant subdomain
             if user.tenant_id:
-                from app.models import Tenant
-                user_tenant = db.query(Tenant).filter(Tenant.id == user.tenant_id).first()
+                user_tenant = await get_by_id(db, Tenant, user.tenant_id)
                 if user_tenant:
                     raise HTTPException(
                         status_code=status.HTTP_400_BAD_REQUEST,
                         detail=f"Please access your account at: https://{user_tenant.subdomain}.darmanager.com",
                     )
     
+    # Warm the user cache for the requests that follow
+    await cache_user(user)
+    
     # Create tokens
     access_token = SecurityService.create_access_token(data={"sub": user.email})
     refresh_token = SecurityService.create_refresh_token(data={"sub": user.email})
@@ -73,17 +79,16 @@ async def login(
 @router.post("/register", response_model=UserSchema)
 async def register(
     user_create: UserCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_admin)
 ):
     """Register a new user (admin only)."""
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_create.email).first()
-    if existing_user:
+    if await db.scalar(_EMAIL_EXISTS, {"email": user_create.email}):
         raise ConflictError("Email already registered")
     
     # Create new user
-    hashed_password = SecurityService.get_password_hash(user_create.password)
+    hashed_password = await SecurityService.get_password_hash_async(user_create.password)
     db_user = User(
         email=user_create.email,
         username=user_create.username,
@@ -95,8 +100,7 @@ async def register(
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
     
     return db_user
 
@@ -4,8 +4,8 @@ Handles CRUD operations for bookings with validation and tenant isolation.
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.models import User, Booking
@@ -13,31 +13,56 @@ from app.schemas import Booking as BookingSchema, BookingCreate, BookingUpdate
 from app.core.security import get_current_user
 from app.core.exceptions import NotFoundError
 from app.services.booking_service import BookingService
+from app.core.tenant import get_user_cache_scope
+from app.core.cache import list_cache_key, cached_list_response
+from app.core.pagination import NEXT_CURSOR_HEADER, next_cursor
 
 router = APIRouter(prefix="/bookings", tags=["Bookings"])
 
 
 @router.get("", response_model=List[BookingSchema])
 async def get_bookings(
+    request: Request,
+    response: Response,
     guest_id: Optional[str] = Query(None),
     property_id: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all bookings for the current user's tenant."""
+    """
+    Get bookings for the current user's tenant, newest first.
+    
+    Pass limit to page through results; the next page's cursor is returned
+    in the X-Next-Cursor header until the last page.
+    """
     service = BookingService(db)
-    return service.get_bookings_for_user(current_user, guest_id, property_id)
+    if limit is not None or cursor is not None:
+        bookings = await service.get_bookings_for_user(current_user, guest_id, property_id, limit, cursor)
+        cursor = next_cursor(bookings, limit)
+        if cursor:
+            response.headers[NEXT_CURSOR_HEADER] = cursor
+        return bookings
+    
+    scope = get_user_cache_scope(current_user)
+    return await cached_list_response(
+        list_cache_key("bookings", scope, guest_id=guest_id, property_id=property_id) if scope else None,
+        BookingSchema,
+        lambda: service.get_bookings_for_user(current_user, guest_id, property_id),
+        request.headers.get("if-none-match")
+    )
 
 
 @router.get("/{booking_id}", response_model=BookingSchema)
 async def get_booking(
     booking_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific booking with tenant validation."""
     service = BookingService(db)
-    booking = service.get_booking_with_validation(booking_id, current_user)
+    booking = await service.get_booking_with_validation(booking_id, current_user)
     
     if not booking:
         raise NotFoundError("Booking", booking_id)
@@ -48,24 +73,24 @@ async def get_booking(
 @router.post("", response_model=BookingSchema)
 async def create_booking(
     booking_create: BookingCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new booking with validation."""
     service = BookingService(db)
-    return service.create_booking(booking_create, current_user)
+    return await service.create_booking(booking_create, current_user)
 
 
 @router.put("/{booking_id}", response_model=BookingSchema)
 async def update_booking(
     booking_id: str,
     booking_update: BookingUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update a booking."""
     service = BookingService(db)
-    booking = service.update_booking(booking_id, booking_update, current_user)
+    booking = await service.update_booking(booking_id, booking_update, current_user)
     
     if not booking:
         raise NotFoundError("Booking", booking_id)
@@ -76,13 +101,13 @@ async def update_booking(
 @router.delete("/{booking_id}")
 async def delete_booking(
     booking_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a booking."""
     service = BookingService(db)
     
-    if not service.delete_booking(booking_id, current_user):
+    if not await service.delete_booking(booking_id, current_user):
         raise NotFoundError("Booking", booking_id)
     
     return {"message": "Booking deleted successfully"}
\ No newline at end of file
@@ -4,7 +4,7 @@ Provides aggregated statistics and metrics.
 """
 
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import func
 
 from app.core.database import get_db
@@ -18,9 +18,9 @@ router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
 @router.get("", response_model=DashboardStats)
 async def get_dashboard(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get dashboard statistics for current user's tenant."""
     service = DashboardService(db)
-    return service.get_dashboard_stats(current_user)
\ No newline at end of file
+    return await service.get_dashboard_stats(current_user)
\ No newline at end of file
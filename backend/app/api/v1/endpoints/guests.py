@@ -3,9 +3,9 @@ Guest management endpoints.
 Handles CRUD operations for guests with tenant isolation.
 """
 
-from typing import List
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.models import User, Guest
@@ -13,29 +13,54 @@ from app.schemas import Guest as GuestSchema, GuestCreate, GuestUpdate
 from app.core.security import get_current_user
 from app.core.exceptions import NotFoundError
 from app.services.guest_service import GuestService
+from app.core.tenant import get_user_cache_scope
+from app.core.cache import list_cache_key, cached_list_response
+from app.core.pagination import NEXT_CURSOR_HEADER, next_cursor
 
 router = APIRouter(prefix="/guests", tags=["Guests"])
 
 
 @router.get("", response_model=List[GuestSchema])
 async def get_guests(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all guests for the current user's tenant."""
+    """
+    Get guests for the current user's tenant, newest first.
+    
+    Pass limit to page through results; the next page's cursor is returned
+    in the X-Next-Cursor header until the last page.
+    """
     service = GuestService(db)
-    return service.get_guests_for_user(current_user)
+    if limit is not None or cursor is not None:
+        guests = await service.get_guests_for_user(current_user, limit, cursor)
+        cursor = next_cursor(guests, limit)
+        if cursor:
+            response.headers[NEXT_CURSOR_HEADER] = cursor
+        return guests
+    
+    scope = get_user_cache_scope(current_user)
+    return await cached_list_response(
+        list_cache_key("guests", scope) if scope else None,
+        GuestSchema,
+        lambda: service.get_guests_for_user(current_user),
+        request.headers.get("if-none-match")
+    )
 
 
 @router.get("/{guest_id}", response_model=GuestSchema)
 async def get_guest(
     guest_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific guest with tenant validation."""
     service = GuestService(db)
-    guest = service.get_guest_with_validation(guest_id, current_user)
+    guest = await service.get_guest_with_validation(guest_id, current_user)
     
     if not guest:
         raise NotFoundError("Guest", guest_id)
@@ -46,24 +71,24 @@ async def get_guest(
 @router.post("", response_model=GuestSchema)
 async def create_guest(
     guest_create: GuestCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new guest with tenant isolation."""
     service = GuestService(db)
-    return service.create_guest(guest_create, current_user)
+    return await service.create_guest(guest_create, current_user)
 
 
 @router.put("/{guest_id}", response_model=GuestSchema)
 async def update_guest(
     guest_id: str,
     guest_update: GuestUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update a guest with tenant validation."""
     service = GuestService(db)
-    guest = service.update_guest(guest_id, guest_update, current_user)
+    guest = await service.update_guest(guest_id, guest_update, current_user)
     
     if not guest:
         raise NotFoundError("Guest", guest_id)
@@ -74,13 +99,13 @@ async def update_guest(
 @router.delete("/{guest_id}")
 async def delete_guest(
     guest_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a guest with tenant validation."""
     service = GuestService(db)
     
-    if not service.delete_guest(guest_id, current_user):
+    if not await service.delete_guest(guest_id, current_user):
         raise NotFoundError("Guest", guest_id)
     
     return {"message": "Guest deleted successfully"}
\ No newline at end of file
@@ -3,9 +3,9 @@ Property management endpoints.
 Handles CRUD operations for properties with tenant isolation.
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.models import Property, User, UserRole
@@ -13,30 +13,54 @@ from app.schemas import Property as PropertySchema, PropertyCreate
 from app.core.security import get_current_user
 from app.core.exceptions import NotFoundError, ForbiddenError
 from app.services.property_service import PropertyService
-from app.core.tenant import get_user_tenant_id, validate_tenant_access
+from app.core.tenant import get_user_tenant_id, validate_tenant_access, get_user_cache_scope
+from app.core.cache import list_cache_key, cached_list_response
+from app.core.pagination import NEXT_CURSOR_HEADER, next_cursor
 
 router = APIRouter(prefix="/properties", tags=["Properties"])
 
 
 @router.get("", response_model=List[PropertySchema])
 async def get_properties(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all properties for the current user's tenant."""
+    """
+    Get properties for the current user's tenant, newest first.
+    
+    Pass limit to page through results; the next page's cursor is returned
+    in the X-Next-Cursor header until the last page.
+    """
     service = PropertyService(db)
-    return service.get_properties_for_user(current_user)
+    if limit is not None or cursor is not None:
+        properties = await service.get_properties_for_user(current_user, limit, cursor)
+        cursor = next_cursor(properties, limit)
+        if cursor:
+            response.headers[NEXT_CURSOR_HEADER] = cursor
+        return properties
+    
+    scope = get_user_cache_scope(current_user)
+    return await cached_list_response(
+        list_cache_key("properties", scope) if scope else None,
+        PropertySchema,
+        lambda: service.get_properties_for_user(current_user),
+        request.headers.get("if-none-match")
+    )
 
 
 @router.get("/{property_id}", response_model=PropertySchema)
 async def get_property(
     property_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a single property by ID with tenant validation."""
     service = PropertyService(db)
-    property = service.get_property_by_id(property_id)
+    property = await service.get_property_by_id(property_id)
     
     if not property:
         raise NotFoundError("Property", property_id)
@@ -51,44 +75,40 @@ async def get_property(
 @router.post("", response_model=PropertySchema)
 async def create_property(
     property_create: PropertyCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new property."""
     service = PropertyService(db)
-    return service.create_property(property_create, current_user)
+    return await service.create_property(property_create, current_user)
 
 
 @router.put("/{property_id}", response_model=PropertySchema)
 async def update_property(
     property_id: str,
     property_update: PropertyCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update a property with tenant validation."""
     service = PropertyService(db)
-    property = service.get_property_by_id(property_id)
+    property = await service.update_property(property_id, property_update, current_user)
     
     if not property:
         raise NotFoundError("Property", property_id)
     
-    # Validate tenant access
-    if not validate_tenant_access(current_user, str(property.tenant_id)):
-        raise NotFoundError("Property", property_id)
-    
-    return service.update_property(property_id, property_update)
+    return property
 
 
 @router.delete("/{property_id}")
 async def delete_property(
     property_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a property with tenant validation."""
     service = PropertyService(db)
-    property = service.get_property_by_id(property_id)
+    property = await service.get_property_by_id(property_id)
     
     if not property:
         raise NotFoundError("Property", property_id)
@@ -97,5 +117,5 @@ async def delete_property(
     if not validate_tenant_access(current_user, str(property.tenant_id)):
         raise NotFoundError("Property", property_id)
     
-    service.delete_property(property_id)
+    await service.delete_property(property_id)
     return {"message": "Property deleted successfully"}
\ No newline at end of file
@@ -4,10 +4,9 @@ Provides revenue and financial reporting capabilities.
 """
 
 from typing import Optional
-from datetime import datetime, timedelta
+from datetime import date
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.models import User, Booking, Property
@@ -22,12 +21,12 @@ router = APIRouter(tags=["Reports"])
 @router.get("/guests/{guest_id}/revenue", response_model=GuestRevenue)
 async def get_guest_revenue(
     guest_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get total revenue from a specific guest (checked-out bookings only)."""
     service = ReportsService(db)
-    revenue = service.get_guest_revenue(guest_id, current_user)
+    revenue = await service.get_guest_revenue(guest_id, current_user)
     
     if not revenue:
         raise NotFoundError("Guest", guest_id)
@@ -38,12 +37,12 @@ async def get_guest_revenue(
 @router.get("/properties/{property_id}/revenue", response_model=PropertyRevenue)
 async def get_property_revenue(
     property_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get total revenue from a specific property (checked-out bookings only)."""
     service = ReportsService(db)
-    revenue = service.get_property_revenue(property_id, current_user)
+    revenue = await service.get_property_revenue(property_id, current_user)
     
     if not revenue:
         raise NotFoundError("Property", property_id)
@@ -53,11 +52,11 @@ async def get_property_revenue(
 
 @router.get("/financial-report", response_model=FinancialReport)
 async def get_financial_report(
-    start_date: Optional[str] = Query(None),
-    end_date: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get financial report for specified date range."""
     service = ReportsService(db)
-    return service.get_financial_report(current_user, start_date, end_date)
\ No newline at end of file
+    return await service.get_financial_report(current_user, start_date, end_date)
\ No newline at end of file
@@ -4,123 +4,153 @@ Handles CRUD operations for rooms.
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import select, update, exists, func, and_, case, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 from datetime import date
 
-from app.core.database import get_db
-from app.models import User, Room, Booking
+from app.core.database import get_db, get_by_id, parse_id
+from app.models import User, Property, Room, Booking, OCCUPYING_BOOKING_STATUSES
 from app.schemas import Room as RoomSchema, RoomCreate, RoomUpdate, RoomWithStatus
 from app.core.security import get_current_user
 from app.core.exceptions import NotFoundError, DependencyConflictError
+from app.core.pagination import NEXT_CURSOR_HEADER, paginate_newest_first, next_cursor
+from app.core.streaming import stream_list_response
+from app.services.dashboard_service import invalidate_dashboard_cache
 
 router = APIRouter(prefix="/rooms", tags=["Rooms"])
 
 
-def calculate_room_status(room: Room, db: Session) -> str:
-    """Calculate dynamic room status based on current date and bookings."""
-    today = date.today()
+def select_rooms_with_status(by_property: bool = False):
+    """
+    Build a query returning (Room, status) rows with the dynamic status computed in SQL.
     
-    # Check for active bookings for this room's property
-    active_booking = db.query(Booking).filter(
-        Booking.property_id == room.property_id,
-        Booking.status.in_(["confirmed", "checked_in"]),
-        Booking.check_in_date <= today,
-        Booking.check_out_date > today
-    ).first()
-    
-    if active_booking:
-        if active_booking.status == "checked_in":
-            return "occupied"
-        elif active_booking.status == "confirmed":
-            return "occupied"
+    A room is "occupied" while its property has an active booking spanning today,
+    "cleaning" when such a booking checks out today, and otherwise keeps its stored status.
+    Execute with a "today" parameter (and "property_id" when by_property is set).
+    """
+    today = bindparam("today")
     
-    # Check if there's a checkout today (needs cleaning)
-    checkout_today = db.query(Booking).filter(
-        Booking.property_id == room.property_id,
-        Booking.status.in_(["confirmed", "checked_in"]),
-        Booking.check_out_date == today
-    ).first()
+    # Today's booking activity per property
+    activity_query = select(
+        Booking.property_id,
+        func.bool_or(
+            and_(Booking.check_in_date <= today, Booking.check_out_date > today)
+        ).label("occupied"),
+        func.bool_or(Booking.check_out_date == today).label("checkout_today")
+    ).where(
+        Booking.status.in_(OCCUPYING_BOOKING_STATUSES),
+        Booking.check_in_date <= today,
+        Booking.check_out_date >= today
+    ).group_by(Booking.property_id)
+    if by_property:
+        activity_query = activity_query.where(Booking.property_id == bindparam("property_id"))
+    activity = activity_query.subquery()
     
-    if checkout_today:
-        return "cleaning"
+    status = case(
+        (activity.c.occupied, "occupied"),
+        (activity.c.checkout_today, "cleaning"),
+        else_=func.coalesce(Room.status, "available")
+    ).label("computed_status")
     
-    return room.status or "available"
+    query = select(Room, status).outerjoin(activity, activity.c.property_id == Room.property_id)
+    if by_property:
+        query = query.where(Room.property_id == bindparam("property_id"))
+    return query.options(raiseload("*"))
+
+
+# Statements for fixed query shapes, built once at import
+_ROOMS_WITH_STATUS = select_rooms_with_status().order_by(Room.created_at.desc())
+_PROPERTY_ROOMS_WITH_STATUS = select_rooms_with_status(by_property=True).order_by(Room.created_at.desc())
+_ROOM_WITH_STATUS_BY_ID = select_rooms_with_status().where(Room.id == bindparam("room_id"))
+_PROPERTY_TENANT_ID = select(Property.tenant_id).where(Property.id == bindparam("property_id"))
+
+
+async def _invalidate_room_dashboard(db: AsyncSession, property_id) -> None:
+    """Drop cached dashboard stats of the tenant owning the property (a super admin has no tenant of their own)."""
+    tenant_id = await db.scalar(_PROPERTY_TENANT_ID, {"property_id": property_id})
+    await invalidate_dashboard_cache(str(tenant_id) if tenant_id else None)
+
+
+def to_room_with_status(room: Room, status: str) -> RoomWithStatus:
+    """Serialize a room with its computed status."""
+    room_with_status = RoomWithStatus.model_validate(room)
+    room_with_status.status = status
+    return room_with_status
 
 
 @router.get("", response_model=List[RoomWithStatus])
 async def get_rooms(
+    response: Response,
     property_id: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all rooms with calculated dynamic status."""
-    query = db.query(Room)
-    if property_id:
-        query = query.filter(Room.property_id == property_id)
+    """
+    Get rooms with calculated dynamic status, newest first.
     
-    rooms = query.order_by(Room.created_at.desc()).all()
+    Pass limit to page through results; the next page's cursor is returned
+    in the X-Next-Cursor header until the last page. Without limit the full
+    list is streamed, encoded row by row rather than through response_model.
+    """
+    # A malformed property id matches no rooms (and would otherwise fail in the database)
+    property_key = None
+    if property_id:
+        property_key = parse_id(property_id)
+        if property_key is None:
+            return []
     
-    # Calculate dynamic status for each room
-    rooms_with_status = []
-    for room in rooms:
-        calculated_status = calculate_room_status(room, db)
-        room_dict = {
-            'id': room.id,
-            'property_id': room.property_id,
-            'name': room.name,
-            'description': room.description,
-            'capacity': room.capacity,
-            'price_per_night': room.price_per_night,
-            'status': calculated_status,
-            'keybox_code': room.keybox_code,
-            'created_at': room.created_at,
-            'updated_at': room.updated_at
-        }
-        rooms_with_status.append(RoomWithStatus(**room_dict))
+    if limit is not None or cursor is not None:
+        query = paginate_newest_first(select_rooms_with_status(by_property=bool(property_id)), Room, limit, cursor)
+        result = await db.execute(query, {"today": date.today(), "property_id": property_key})
+        rooms = [to_room_with_status(room, status) for room, status in result]
+        cursor = next_cursor(rooms, limit)
+        if cursor:
+            response.headers[NEXT_CURSOR_HEADER] = cursor
+        return rooms
     
-    return rooms_with_status
+    if property_id:
+        query, params = _PROPERTY_ROOMS_WITH_STATUS, {"today": date.today(), "property_id": property_key}
+    else:
+        query, params = _ROOMS_WITH_STATUS, {"today": date.today()}
+    return await stream_list_response(
+        query, params, lambda row: to_room_with_status(*row).model_dump(mode="json")
+    )
 
 
 @router.get("/{room_id}", response_model=RoomWithStatus)
 async def get_room(
     room_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a single room by ID with calculated dynamic status."""
-    db_room = db.query(Room).filter(Room.id == room_id).first()
-    if not db_room:
+    room_key = parse_id(room_id)
+    if room_key is None:
+        raise NotFoundError("Room", room_id)
+    
+    result = await db.execute(_ROOM_WITH_STATUS_BY_ID, {"today": date.today(), "room_id": room_key})
+    row = result.one_or_none()
+    if not row:
         raise NotFoundError("Room", room_id)
     
-    # Calculate dynamic status
-    calculated_status = calculate_room_status(db_room, db)
-    room_dict = {
-        'id': db_room.id,
-        'property_id': db_room.property_id,
-        'name': db_room.name,
-        'description': db_room.description,
-        'capacity': db_room.capacity,
-        'price_per_night': db_room.price_per_night,
-        'status': calculated_status,
-        'keybox_code': db_room.keybox_code,
-        'created_at': db_room.created_at,
-        'updated_at': db_room.updated_at
-    }
-    return RoomWithStatus(**room_dict)
+    return to_room_with_status(*row)
 
 
 @router.post("", response_model=RoomSchema)
 async def create_room(
     room_create: RoomCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new room."""
-    db_room = Room(**room_create.dict())
+    db_room = Room(**room_create.model_dump())
     db.add(db_room)
-    db.commit()
-    db.refresh(db_room)
+    await db.commit()
+    await _invalidate_room_dashboard(db, db_room.property_id)
     return db_room
 
 
@@ -128,43 +158,54 @@ async def create_room(
 async def update_room(
     room_id: str,
     room_update: RoomUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update a room."""
-    db_room = db.query(Room).filter(Room.id == room_id).first()
-    if not db_room:
+    room_key = parse_id(room_id)
+    if room_key is None:
         raise NotFoundError("Room", room_id)
     
-    update_data = room_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_room, field, value)
+    # Update and fetch the row in a single statement
+    update_data = room_update.model_dump(exclude_unset=True)
+    if update_data:
+        result = await db.execute(
+            update(Room).where(Room.id == room_key).values(**update_data).returning(Room)
+        )
+        db_room = result.scalar_one_or_none()
+    else:
+        db_room = await get_by_id(db, Room, room_key)
+    if not db_room:
+        raise NotFoundError("Room", room_id)
     
-    db.commit()
-    db.refresh(db_room)
+    await db.commit()
+    await _invalidate_room_dashboard(db, db_room.property_id)
     return db_room
 
 
 @router.delete("/{room_id}")
 async def delete_room(
     room_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a room with dependency checking."""
-    db_room = db.query(Room).filter(Room.id == room_id).first()
+    db_room = await get_by_id(db, Room, room_id)
     if not db_room:
         raise NotFoundError("Room", room_id)
     
-    # Check for dependencies (bookings)
-    booking_count = db.query(Booking).filter(Booking.room_id == room_id).count()
-    if booking_count > 0:
+    # Check for dependencies (bookings); only count them when reporting the conflict
+    if await db.scalar(select(exists().where(Booking.room_id == room_id))):
+        booking_count = await db.scalar(
+            select(func.count()).select_from(Booking).where(Booking.room_id == room_id)
+        )
         raise DependencyConflictError(
             resource=f"room '{db_room.name}'",
             dependencies=f"{booking_count} booking(s)"
         )
     
-    db.delete(db_room)
-    db.commit()
+    await db.delete(db_room)
+    await db.commit()
+    await _invalidate_room_dashboard(db, db_room.property_id)
     
     return {"message": "Room deleted successfully"}
\ No newline at end of file
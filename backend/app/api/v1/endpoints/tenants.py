@@ -4,39 +4,49 @@ Super admin only endpoints for tenant management.
 """
 
 from typing import List
-from fastapi import APIRouter, Depends, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import select, update, exists, false, bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.models import User, Tenant, Property, Guest, Booking
+from app.core.config import settings
+from app.core.database import get_db, get_by_id, parse_id
+from app.models import User, UserRole, Tenant, Property, Guest, Booking
 from app.schemas import (
     Tenant as TenantSchema, TenantCreate, TenantUpdate,
     User as UserSchema, UserCreate
 )
-from app.core.security import require_super_admin, SecurityService
+from app.core.security import require_super_admin, SecurityService, uncache_user
 from app.core.exceptions import NotFoundError, ConflictError
+from app.core.tenant import cache_tenants, uncache_tenant, get_tenant_from_subdomain
+from app.core.cache import invalidate_list_cache
+from app.services.dashboard_service import invalidate_dashboard_cache
+from app.services.reports_service import invalidate_report_cache
 
 router = APIRouter(tags=["Tenants"])
 
+# Statements for fixed query shapes, built once at import
+_EMAIL_EXISTS = select(exists().where(User.email == bindparam("email")))
+
 
 @router.get("/admin/tenants", response_model=List[TenantSchema])
 async def get_all_tenants(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_super_admin)
 ):
     """Get all tenants (Super admin only)."""
-    tenants = db.query(Tenant).order_by(Tenant.created_at.desc()).all()
+    result = await db.execute(select(Tenant).order_by(Tenant.created_at.desc()))
+    tenants = result.scalars().all()
     return tenants
 
 
 @router.get("/admin/tenants/{tenant_id}", response_model=TenantSchema)
 async def get_tenant(
     tenant_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_super_admin)
 ):
     """Get a specific tenant (Super admin only)."""
-    tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
+    tenant = await get_by_id(db, Tenant, tenant_id)
     if not tenant:
         raise NotFoundError("Tenant", tenant_id)
     return tenant
@@ -45,26 +55,24 @@ async def get_tenant(
 @router.post("/admin/tenants", response_model=TenantSchema)
 async def create_tenant(
     tenant_create: TenantCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_super_admin)
 ):
     """Create a new tenant (Super admin only)."""
     # Check if subdomain already exists
-    existing_tenant = db.query(Tenant).filter(Tenant.subdomain == tenant_create.subdomain).first()
-    if existing_tenant:
+    if await db.scalar(select(exists().where(Tenant.subdomain == tenant_create.subdomain))):
         raise ConflictError("Subdomain already exists")
     
     # Check if domain already exists (if provided)
     if tenant_create.domain:
-        existing_domain = db.query(Tenant).filter(Tenant.domain == tenant_create.domain).first()
-        if existing_domain:
+        if await db.scalar(select(exists().where(Tenant.domain == tenant_create.domain))):
             raise ConflictError("Domain already exists")
     
     # Create tenant
-    db_tenant = Tenant(**tenant_create.dict())
+    db_tenant = Tenant(**tenant_create.model_dump())
     db.add(db_tenant)
-    db.commit()
-    db.refresh(db_tenant)
+    await db.commit()
+    await cache_tenants(db_tenant)
     return db_tenant
 
 
@@ -72,74 +80,108 @@ async def create_tenant(
 async def update_tenant(
     tenant_id: str,
     tenant_update: TenantUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_super_admin)
 ):
     """Update a tenant (Super admin only)."""
-    db_tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
-    if not db_tenant:
+    tenant_key = parse_id(tenant_id)
+    if tenant_key is None:
         raise NotFoundError("Tenant", tenant_id)
     
-    # Update fields
-    update_data = tenant_update.dict(exclude_unset=True)
-    
-    # Check subdomain uniqueness if being updated
-    if "subdomain" in update_data:
-        existing_tenant = db.query(Tenant).filter(
-            Tenant.subdomain == update_data["subdomain"],
-            Tenant.id != tenant_id
-        ).first()
-        if existing_tenant:
+    update_data = tenant_update.model_dump(exclude_unset=True)
+    
+    # Check subdomain and domain uniqueness (if being updated) in one round-trip
+    check_subdomain = "subdomain" in update_data
+    check_domain = "domain" in update_data and update_data["domain"]
+    if check_subdomain or check_domain:
+        duplicates = (await db.execute(
+            select(
+                exists().where(
+                    Tenant.subdomain == update_data["subdomain"],
+                    Tenant.id != tenant_key
+                ).label("subdomain") if check_subdomain else false().label("subdomain"),
+                exists().where(
+                    Tenant.domain == update_data["domain"],
+                    Tenant.id != tenant_key
+                ).label("domain") if check_domain else false().label("domain")
+            )
+        )).one()
+        if duplicates.subdomain:
             raise ConflictError("Subdomain already exists")
-    
-    # Check domain uniqueness if being updated
-    if "domain" in update_data and update_data["domain"]:
-        existing_domain = db.query(Tenant).filter(
-            Tenant.domain == update_data["domain"],
-            Tenant.id != tenant_id
-        ).first()
-        if existing_domain:
+        if duplicates.domain:
             raise ConflictError("Domain already exists")
     
-    for field, value in update_data.items():
-        setattr(db_tenant, field, value)
+    # Update and fetch the row in a single statement
+    if update_data:
+        result = await db.execute(
+            update(Tenant).where(Tenant.id == tenant_key).values(**update_data).returning(Tenant)
+        )
+        db_tenant = result.scalar_one_or_none()
+    else:
+        db_tenant = await get_by_id(db, Tenant, tenant_key)
+    if not db_tenant:
+        raise NotFoundError("Tenant", tenant_id)
     
-    db.commit()
-    db.refresh(db_tenant)
+    await db.commit()
+    await cache_tenants(db_tenant)
     return db_tenant
 
 
 @router.delete("/admin/tenants/{tenant_id}")
 async def delete_tenant(
     tenant_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_super_admin)
 ):
     """Delete a tenant (Super admin only). WARNING: This will delete all tenant data!"""
-    db_tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
-    if not db_tenant:
+    tenant_key = parse_id(tenant_id)
+    if tenant_key is None:
+        raise NotFoundError("Tenant", tenant_id)
+    # Cache keys use the canonical form of the id
+    tenant_id = str(tenant_key)
+    
+    # Raw SQL avoids loading objects and bypasses SQLAlchemy relationship management
+    # Count related data and delete the tenant in one statement; every CTE sees the
+    # pre-delete snapshot, so the counts describe what the cascade removes
+    counts = (await db.execute(
+        text("""
+            WITH u AS (
+                     SELECT COUNT(*) AS c, COALESCE(array_agg(email), '{}') AS emails
+                     FROM users WHERE tenant_id = :tenant_id
+                 ),
+                 p AS (SELECT COUNT(*) AS c FROM properties WHERE tenant_id = :tenant_id),
+                 g AS (SELECT COUNT(*) AS c FROM guests WHERE tenant_id = :tenant_id),
+                 b AS (
+                     SELECT COUNT(*) AS c FROM bookings b
+                     JOIN properties pr ON b.property_id = pr.id
+                     WHERE pr.tenant_id = :tenant_id
+                 ),
+                 deleted AS (DELETE FROM tenants WHERE id = :tenant_id RETURNING subdomain)
+            SELECT deleted.subdomain, u.emails, u.c AS users, p.c AS properties, g.c AS guests, b.c AS bookings
+            FROM deleted, u, p, g, b
+        """),
+        {"tenant_id": tenant_id}
+    )).one_or_none()
+    if not counts:
         raise NotFoundError("Tenant", tenant_id)
     
-    # Get count of related data that will be deleted (using raw SQL to avoid loading objects)
-    from sqlalchemy import text
-    
-    # Count related data without loading into SQLAlchemy session
-    user_count = db.execute(text("SELECT COUNT(*) FROM users WHERE tenant_id = :tenant_id"), {"tenant_id": tenant_id}).scalar()
-    property_count = db.execute(text("SELECT COUNT(*) FROM properties WHERE tenant_id = :tenant_id"), {"tenant_id": tenant_id}).scalar()
-    guest_count = db.execute(text("SELECT COUNT(*) FROM guests WHERE tenant_id = :tenant_id"), {"tenant_id": tenant_id}).scalar()
-    booking_count = db.execute(text("SELECT COUNT(*) FROM bookings b JOIN properties p ON b.property_id = p.id WHERE p.tenant_id = :tenant_id"), {"tenant_id": tenant_id}).scalar()
-    
-    # Delete the tenant using raw SQL to bypass SQLAlchemy relationship management
-    db.execute(text("DELETE FROM tenants WHERE id = :tenant_id"), {"tenant_id": tenant_id})
-    db.commit()
+    await db.commit()
+    await uncache_tenant(counts.subdomain)
+    # Cached users would keep authenticating with a tenant that no longer exists
+    await uncache_user(*counts.emails)
+    for namespace in ("properties", "guests", "bookings"):
+        await invalidate_list_cache(namespace, tenant_id)
+    # The cascade removed data counted in dashboards and financial reports
+    await invalidate_dashboard_cache(tenant_id)
+    await invalidate_report_cache()
     
     return {
         "message": "Tenant deleted successfully",
         "deleted_data": {
-            "users": user_count,
-            "properties": property_count,
-            "guests": guest_count,
-            "bookings": booking_count
+            "users": counts.users,
+            "properties": counts.properties,
+            "guests": counts.guests,
+            "bookings": counts.bookings
         }
     }
 
@@ -148,24 +190,21 @@ async def delete_tenant(
 async def create_tenant_admin(
     tenant_id: str,
     user_create: UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_super_admin)
 ):
     """Create an admin user for a specific tenant (Super admin only)."""
-    from app.models import UserRole
-    
     # Verify tenant exists
-    tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
+    tenant = await get_by_id(db, Tenant, tenant_id)
     if not tenant:
         raise NotFoundError("Tenant", tenant_id)
     
     # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user_create.email).first()
-    if existing_user:
+    if await db.scalar(_EMAIL_EXISTS, {"email": user_create.email}):
         raise ConflictError("Email already registered")
     
     # Create user with tenant_id and ADMIN role
-    hashed_password = SecurityService.get_password_hash(user_create.password)
+    hashed_password = await SecurityService.get_password_hash_async(user_create.password)
     db_user = User(
         email=user_create.email,
         username=user_create.username,
@@ -177,21 +216,22 @@ async def create_tenant_admin(
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
     return db_user
 
 
 @router.get("/tenant/current", response_model=TenantSchema)
 async def get_current_tenant_info(
     request: Request,
-    db: Session = Depends(get_db)
+    response: Response,
+    db: AsyncSession = Depends(get_db)
 ):
     """Get current tenant information (no auth required for tenant detection)."""
-    from app.core.tenant import get_tenant_from_subdomain
-    
     tenant = await get_tenant_from_subdomain(request, db)
     if not tenant:
         raise NotFoundError("Tenant", "current")
     
+    # Public and rarely changing, so let proxies absorb repeated lookups (per tenant host)
+    response.headers["Cache-Control"] = f"public, max-age={settings.TENANT_INFO_MAX_AGE}"
+    response.headers["Vary"] = "Host, X-Tenant-Subdomain"
     return tenant
\ No newline at end of file
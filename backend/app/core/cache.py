@@ -0,0 +1,250 @@
+"""
+Redis-backed caching utilities.
+Caching is optional: when REDIS_URL is not configured (or Redis is unreachable)
+every helper degrades to a cache miss and callers fall back to the database.
+List responses are the exception: without Redis they are kept in a small
+per-worker TTL cache instead.
+"""
+
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Type
+
+import orjson
+import redis.asyncio as redis
+from cachetools import TTLCache
+from redis.exceptions import RedisError
+from fastapi import Response
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Strong references to in-flight background refreshes (the event loop only keeps weak ones)
+_refresh_tasks: Set[asyncio.Task] = set()
+
+# Serialized list responses and their ETags held in this worker when Redis is not configured
+_local_list_cache: TTLCache = TTLCache(maxsize=256, ttl=settings.LIST_CACHE_TTL)
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """Get the shared Redis client, or None when caching is disabled."""
+    return settings.redis_client
+
+
+async def cache_get(key: str) -> Optional[Any]:
+    """Get a JSON value from the cache."""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        raw = await client.get(key)
+    except RedisError as e:
+        logger.warning(f"Cache read failed for {key}: {str(e)}")
+        return None
+    return json.loads(raw) if raw is not None else None
+
+
+async def cache_set(key: str, value: Any, ttl: int) -> None:
+    """Store a JSON-serializable value in the cache with a TTL in seconds."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        await client.setex(key, ttl, json.dumps(value))
+    except RedisError as e:
+        logger.warning(f"Cache write failed for {key}: {str(e)}")
+
+
+async def cache_delete(*keys: str) -> None:
+    """Remove keys from the cache."""
+    client = get_redis()
+    if client is None or not keys:
+        return
+    try:
+        await client.delete(*keys)
+    except RedisError as e:
+        logger.warning(f"Cache invalidation failed for {keys}: {str(e)}")
+
+
+async def cache_delete_pattern(pattern: str) -> None:
+    """Remove every key matching a glob-style pattern."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        keys = [key async for key in client.scan_iter(match=pattern, count=500)]
+        if keys:
+            await client.unlink(*keys)
+    except RedisError as e:
+        logger.warning(f"Cache invalidation failed for {pattern}: {str(e)}")
+
+
+async def cache_hget(name: str, key: str) -> Optional[Any]:
+    """Get a JSON value from a cache hash field."""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        raw = await client.hget(name, key)
+    except RedisError as e:
+        logger.warning(f"Cache read failed for {name}[{key}]: {str(e)}")
+        return None
+    return json.loads(raw) if raw is not None else None
+
+
+async def cache_hset(name: str, mapping: Dict[str, Any]) -> None:
+    """Store JSON-serializable values in cache hash fields."""
+    client = get_redis()
+    if client is None or not mapping:
+        return
+    try:
+        await client.hset(name, mapping={key: json.dumps(value) for key, value in mapping.items()})
+    except RedisError as e:
+        logger.warning(f"Cache write failed for {name}: {str(e)}")
+
+
+async def cache_hdel(name: str, *keys: str) -> None:
+    """Remove fields from a cache hash."""
+    client = get_redis()
+    if client is None or not keys:
+        return
+    try:
+        await client.hdel(name, *keys)
+    except RedisError as e:
+        logger.warning(f"Cache invalidation failed for {name}{list(keys)}: {str(e)}")
+
+
+def list_cache_key(namespace: str, scope: str, **params: Optional[str]) -> str:
+    """Cache key for a list endpoint response within a tenant scope."""
+    query = "&".join(f"{name}={value}" for name, value in sorted(params.items()) if value is not None)
+    return f"list:{namespace}:{scope}:{query}"
+
+
+async def invalidate_list_cache(namespace: str, tenant_id: Optional[str]) -> None:
+    """Drop cached list responses for a tenant (and the all-tenant view), or every scope if unknown."""
+    if tenant_id:
+        prefixes = (f"list:{namespace}:{tenant_id}:", f"list:{namespace}:all:")
+    else:
+        prefixes = (f"list:{namespace}:",)
+    
+    for key in [key for key in _local_list_cache if key.startswith(prefixes)]:
+        _local_list_cache.pop(key, None)
+    for prefix in prefixes:
+        await cache_delete_pattern(f"{prefix}*")
+
+
+def body_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def conditional_json_response(body: bytes, etag: str, if_none_match: Optional[str]) -> Response:
+    """JSON response carrying an ETag, or an empty 304 when the client already has this body."""
+    # Private: list bodies are per-tenant; no-cache: browsers revalidate on every use
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match:
+        # Weak comparison: a gzipping proxy may have turned our ETag into W/"..."
+        client_etags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in client_etags or etag in client_etags:
+            return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+async def cached_list_response(
+    key: Optional[str],
+    schema: Type[BaseModel],
+    load: Callable[[], Awaitable[Iterable[Any]]],
+    if_none_match: Optional[str] = None
+) -> Any:
+    """
+    Serve a list endpoint from its serialized JSON cache entry.
+    
+    On a miss the items are loaded, serialized through the response schema and
+    cached for LIST_CACHE_TTL seconds. Without a key the loaded items are
+    returned untouched. Without Redis the encoded body is cached in-process,
+    so other workers may serve it until the TTL expires.
+    
+    Cached responses carry an ETag of the body; pass the request's
+    If-None-Match header to answer unchanged lists with 304 Not Modified.
+    """
+    if key is None:
+        return await load()
+    
+    if get_redis() is None:
+        entry = _local_list_cache.get(key)
+        if entry is None:
+            body = orjson.dumps([schema.model_validate(item).model_dump(mode="json") for item in await load()])
+            entry = _local_list_cache[key] = (body, body_etag(body))
+        return conditional_json_response(*entry, if_none_match)
+    
+    payload = await cache_get(key)
+    if payload is None:
+        payload = [schema.model_validate(item).model_dump(mode="json") for item in await load()]
+        await cache_set(key, payload, settings.LIST_CACHE_TTL)
+    body = orjson.dumps(payload)
+    return conditional_json_response(body, body_etag(body), if_none_match)
+
+
+async def cache_get_or_refresh(
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    ttl: int,
+    stale_ttl: int,
+    refresher: Optional[Callable[[], Awaitable[Any]]] = None
+) -> Any:
+    """
+    Stale-while-revalidate lookup.
+    
+    Fresh entries (younger than ttl) are returned as-is. Stale entries (up to
+    stale_ttl) are returned immediately while a single background task reloads
+    them with refresher (defaults to loader). On a miss the loader runs inline.
+    The refresher must not depend on the caller's database session, since it
+    can outlive the request.
+    """
+    entry = await cache_get(key)
+    if entry is not None:
+        if entry["fresh_until"] < time.time():
+            await _schedule_refresh(key, refresher or loader, ttl, stale_ttl)
+        return entry["value"]
+    
+    value = await loader()
+    await _store_with_freshness(key, value, ttl, stale_ttl)
+    return value
+
+
+async def _store_with_freshness(key: str, value: Any, ttl: int, stale_ttl: int) -> None:
+    await cache_set(key, {"value": value, "fresh_until": time.time() + ttl}, stale_ttl)
+
+
+async def _schedule_refresh(
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    ttl: int,
+    stale_ttl: int
+) -> None:
+    client = get_redis()
+    try:
+        # Only one worker refreshes a given key at a time
+        if not await client.set(f"{key}:refreshing", 1, nx=True, ex=ttl):
+            return
+    except RedisError as e:
+        logger.warning(f"Cache refresh lock failed for {key}: {str(e)}")
+        return
+    
+    async def refresh():
+        try:
+            await _store_with_freshness(key, await loader(), ttl, stale_ttl)
+        except Exception as e:
+            # Keep serving the stale value; the next access retries
+            logger.warning(f"Background cache refresh failed for {key}: {str(e)}")
+        finally:
+            await cache_delete(f"{key}:refreshing")
+    
+    task = asyncio.create_task(refresh())
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
@@ -0,0 +1,55 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+Pages are ordered newest first on (created_at, id); the cursor is an opaque
+token encoding the last row of the previous page.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import Select, tuple_
+
+from app.core.exceptions import ValidationError
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """Build an opaque cursor pointing just past the given row."""
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Parse a cursor produced by encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|")
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationError("Invalid pagination cursor")
+
+
+def paginate_newest_first(
+    query: Select,
+    model: Any,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> Select:
+    """Order a query newest first and restrict it to the page after the cursor."""
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.where(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(limit)
+
+
+def next_cursor(items: Sequence[Any], limit: Optional[int]) -> Optional[str]:
+    """Cursor for the page after items, or None when this was the last page."""
+    if limit is None or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last.created_at, last.id)
@@ -3,16 +3,25 @@ Security utilities for authentication and authorization.
 Centralized security management for production use.
 """
 
+import os
 import jwt
+import hmac
+import time
+import uuid
+import asyncio
+import hashlib
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
+from cachetools import TTLCache
 from passlib.context import CryptContext
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.cache import cache_get, cache_set, cache_delete
 from app.models import User, UserRole
 
 
@@ -22,6 +31,63 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # HTTP Bearer security scheme
 security = HTTPBearer()
 
+# Statement for the per-request user lookup, built once at import
+_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+
+# Verified token payloads keyed by token digest (the raw token is never stored)
+_verified_tokens: TTLCache = TTLCache(maxsize=10_000, ttl=settings.JWT_CACHE_TTL)
+
+# Recent successful logins: keyed digest of (email, password) -> password hash it matched.
+# The key is salted per process so the cached digests can't be brute-forced offline.
+_recent_logins: TTLCache = TTLCache(maxsize=1024, ttl=max(settings.LOGIN_CACHE_TTL, 1))
+_LOGIN_CACHE_SALT = os.urandom(32)
+
+
+def user_cache_key(email: str) -> str:
+    """Cache key for an authenticated user looked up by token subject."""
+    return f"u:{email}"
+
+
+async def cache_user(user: User):
+    """Cache the fields needed to authorize requests (never the password hash)."""
+    await cache_set(
+        user_cache_key(user.email),
+        {
+            "id": str(user.id),
+            "email": user.email,
+            "username": user.username,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "role": user.role.name if user.role else None,
+            "tenant_id": str(user.tenant_id) if user.tenant_id else None,
+            "is_active": user.is_active,
+            "created_at": user.created_at.isoformat() if user.created_at else None,
+            "updated_at": user.updated_at.isoformat() if user.updated_at else None
+        },
+        settings.USER_CACHE_TTL
+    )
+
+
+async def uncache_user(*emails: str):
+    """Drop cached users; call after deleting or changing them."""
+    await cache_delete(*(user_cache_key(email) for email in emails))
+
+
+def user_from_cache(data: Dict[str, Any]) -> User:
+    """Hydrate a detached, read-only User from its cached representation."""
+    return User(
+        id=uuid.UUID(data["id"]),
+        email=data["email"],
+        username=data["username"],
+        first_name=data["first_name"],
+        last_name=data["last_name"],
+        role=UserRole[data["role"]] if data["role"] else None,
+        tenant_id=uuid.UUID(data["tenant_id"]) if data["tenant_id"] else None,
+        is_active=data["is_active"],
+        created_at=datetime.fromisoformat(data["created_at"]) if data["created_at"] else None,
+        updated_at=datetime.fromisoformat(data["updated_at"]) if data["updated_at"] else None
+    )
+
 
 class SecurityService:
     """Centralized security service for authentication and authorization."""
@@ -36,6 +102,18 @@ class SecurityService:
         """Generate password hash."""
         return pwd_context.hash(password)
     
+    @staticmethod
+    async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+        """Verify a password on a worker thread so bcrypt doesn't block the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, SecurityService.verify_password, plain_password, hashed_password)
+    
+    @staticmethod
+    async def get_password_hash_async(password: str) -> str:
+        """Hash a password on a worker thread so bcrypt doesn't block the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, SecurityService.get_password_hash, password)
+    
     @staticmethod
     def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
         """Create JWT access token."""
@@ -69,31 +147,62 @@ class SecurityService:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token has expired"
             )
-        except jwt.JWTError:
+        except jwt.InvalidTokenError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token"
             )
     
     @staticmethod
-    def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+    def verify_token_cached(token: str) -> Dict[str, Any]:
+        """
+        Verify a JWT token, reusing recent results when JWT_CACHE_ENABLED is set.
+        
+        A cached payload is only served until its own expiry; after that the
+        token is verified again, which raises the usual expired-token error.
+        """
+        if not settings.JWT_CACHE_ENABLED:
+            return SecurityService.verify_token(token)
+        
+        key = hashlib.sha256(token.encode()).hexdigest()
+        payload = _verified_tokens.get(key)
+        if payload is None or payload.get("exp", 0) <= time.time():
+            payload = SecurityService.verify_token(token)
+            _verified_tokens[key] = payload
+        return payload
+    
+    @staticmethod
+    async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
         """Authenticate user by email and password."""
-        user = db.query(User).filter(User.email == email).first()
+        result = await db.execute(_USER_BY_EMAIL, {"email": email})
+        user = result.scalar_one_or_none()
         if not user:
             return None
-        if not SecurityService.verify_password(password, user.hashed_password):
+        
+        # Repeat logins with the same credentials skip bcrypt while the stored hash is
+        # unchanged; failed attempts are never cached
+        key = hmac.new(_LOGIN_CACHE_SALT, f"{email}\0{password}".encode(), hashlib.sha256).digest()
+        if settings.LOGIN_CACHE_TTL > 0 and _recent_logins.get(key) == user.hashed_password:
+            return user
+        if not await SecurityService.verify_password_async(password, user.hashed_password):
             return None
+        if settings.LOGIN_CACHE_TTL > 0:
+            _recent_logins[key] = user.hashed_password
         return user
 
 
-def get_current_user(
+async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     """Get current authenticated user from JWT token."""
     try:
-        token = credentials.credentials
-        payload = SecurityService.verify_token(token)
+        # Decode the token once per request; later callers reuse the verified payload
+        payload = getattr(request.state, "jwt_payload", None)
+        if payload is None:
+            payload = SecurityService.verify_token_cached(credentials.credentials)
+            request.state.jwt_payload = payload
         
         # Check token type
         if payload.get("type") != "access":
@@ -110,13 +219,19 @@ def get_current_user(
                 detail="Invalid token payload"
             )
         
-        # Get user from database
-        user = db.query(User).filter(User.email == email).first()
-        if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
-            )
+        # Get user from cache, falling back to the database
+        cached = await cache_get(user_cache_key(email))
+        if cached is not None:
+            user = user_from_cache(cached)
+        else:
+            result = await db.execute(_USER_BY_EMAIL, {"email": email})
+            user = result.scalar_one_or_none()
+            if user is None:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="User not found"
+                )
+            await cache_user(user)
         
         if not user.is_active:
             raise HTTPException(
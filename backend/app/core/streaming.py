@@ -0,0 +1,54 @@
+"""
+Streaming JSON responses for large list endpoints.
+Rows are fetched through a server-side cursor and encoded one at a time, so
+neither the full result set nor its serialized form is held in memory.
+"""
+
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+import orjson
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Executable
+from starlette.background import BackgroundTask
+
+from app.core.database import AsyncSessionLocal
+
+# Rows fetched from the server-side cursor per round-trip
+STREAM_BATCH_SIZE = 500
+
+
+async def stream_list_response(
+    query: Executable,
+    params: Optional[Dict[str, Any]],
+    serialize: Callable[[Any], Any]
+) -> StreamingResponse:
+    """
+    Stream a query's rows as a JSON array.
+    
+    serialize turns each result row into a JSON-compatible value. The query
+    runs on its own session so it doesn't depend on when the request's
+    session is torn down relative to the streamed body.
+    
+    The query is started before the response is returned, so errors running
+    it still produce an error status; once rows are being sent, a failure
+    can only cut the body short.
+    """
+    db = AsyncSessionLocal()
+    try:
+        result = await db.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE), params)
+    except BaseException:
+        await db.close()
+        raise
+    
+    async def body() -> AsyncIterator[bytes]:
+        try:
+            separator = b"["
+            async for row in result:
+                yield separator + orjson.dumps(serialize(row))
+                separator = b","
+            yield b"[]" if separator == b"[" else b"]"
+        finally:
+            await db.close()
+    
+    # Closing twice is harmless; the background task covers a body that never starts
+    return StreamingResponse(body(), media_type="application/json", background=BackgroundTask(db.close))
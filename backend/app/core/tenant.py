@@ -4,11 +4,22 @@ Tenant context and middleware for multi-tenant support.
 
 from typing import Optional
 from fastapi import Request, HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from cachetools import TTLCache
 import threading
 
-from app.models import Tenant, User
+from app.models import Tenant, User, UserRole
+from app.schemas import Tenant as TenantSchema
 from app.core.database import get_db
+from app.core.cache import cache_hget, cache_hset, cache_hdel
+from app.core.config import settings
+
+# Statement for the per-request tenant lookup, built once at import
+_ACTIVE_TENANT_BY_SUBDOMAIN = select(Tenant).where(
+    Tenant.subdomain == bindparam("subdomain"),
+    Tenant.is_active == True
+)
 
 # Thread-local storage for tenant context
 _tenant_context = threading.local()
@@ -34,6 +45,33 @@ def set_tenant_context(tenant_id: Optional[str], tenant: Optional[Tenant] = None
     context.tenant = tenant
     context.user = user
 
+# Redis hash mapping subdomain -> serialized active tenant
+TENANT_CACHE_KEY = "tenants:by_subdomain"
+
+# Subdomains with no active tenant, remembered briefly in this worker so that
+# unauthenticated probes for unknown hosts don't each cost a database query
+_unknown_subdomains: TTLCache = TTLCache(maxsize=1024, ttl=settings.TENANT_MISS_CACHE_TTL)
+
+async def cache_tenants(*tenants: Tenant):
+    """Store active tenants in the subdomain cache and drop inactive ones."""
+    for tenant in tenants:
+        if tenant.is_active:
+            _unknown_subdomains.pop(tenant.subdomain, None)
+    await cache_hset(TENANT_CACHE_KEY, {
+        tenant.subdomain: TenantSchema.model_validate(tenant).model_dump(mode="json")
+        for tenant in tenants if tenant.is_active
+    })
+    await cache_hdel(TENANT_CACHE_KEY, *(tenant.subdomain for tenant in tenants if not tenant.is_active))
+
+async def uncache_tenant(subdomain: str):
+    """Drop a tenant from the subdomain cache."""
+    await cache_hdel(TENANT_CACHE_KEY, subdomain)
+
+async def warm_tenant_cache(db: AsyncSession):
+    """Load every active tenant into the subdomain cache."""
+    result = await db.execute(select(Tenant).where(Tenant.is_active == True))
+    await cache_tenants(*result.scalars().all())
+
 def clear_tenant_context():
     """Clear the current tenant context."""
     context = get_tenant_context()
@@ -41,7 +79,7 @@ def clear_tenant_context():
     context.tenant = None
     context.user = None
 
-async def get_tenant_from_subdomain(request: Request, db: Session) -> Optional[Tenant]:
+async def get_tenant_from_subdomain(request: Request, db: AsyncSession) -> Optional[Tenant]:
     """Extract tenant from subdomain in the request."""
     # First, check for the X-Tenant-Subdomain header (set by Nginx)
     subdomain = request.headers.get("x-tenant-subdomain")
@@ -70,24 +108,35 @@ async def get_tenant_from_subdomain(request: Request, db: Session) -> Optional[T
     if not subdomain:
         return None
     
+    # Serve from cache when possible (returns a detached, read-only Tenant)
+    cached = await cache_hget(TENANT_CACHE_KEY, subdomain)
+    if cached is not None:
+        return Tenant(**TenantSchema(**cached).model_dump())
+    if subdomain in _unknown_subdomains:
+        return None
+    
     # Find tenant by subdomain
-    tenant = db.query(Tenant).filter(
-        Tenant.subdomain == subdomain,
-        Tenant.is_active == True
-    ).first()
+    result = await db.execute(_ACTIVE_TENANT_BY_SUBDOMAIN, {"subdomain": subdomain})
+    tenant = result.scalar_one_or_none()
+    
+    # Warm the cache lazily (e.g. after a Redis restart)
+    if tenant:
+        await cache_tenants(tenant)
+    else:
+        _unknown_subdomains[subdomain] = True
     
     return tenant
 
 async def get_current_tenant(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Optional[Tenant]:
     """Get current tenant from request context."""
     return await get_tenant_from_subdomain(request, db)
 
 async def require_tenant(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Tenant:
     """Require a valid tenant context (for tenant-specific endpoints)."""
     tenant = await get_tenant_from_subdomain(request, db)
@@ -99,18 +148,32 @@ async def require_tenant(
     return tenant
 
 def get_user_tenant_id(user: User) -> Optional[str]:
-    """Get tenant ID for a user. Super admins have no tenant."""
-    from app.models import UserRole
+    """
+    Get tenant ID for a user. Super admins have no tenant.
+    
+    The result is memoized on the user instance, which lives for a single
+    request, so repeated calls from services don't recompute it.
+    """
+    if "_tenant_id" in user.__dict__:
+        return user.__dict__["_tenant_id"]
     
     if user.role == UserRole.SUPER_ADMIN:
-        return None  # Super admin can access all tenants
+        tenant_id = None  # Super admin can access all tenants
+    else:
+        tenant_id = str(user.tenant_id) if user.tenant_id else None
     
-    return str(user.tenant_id) if user.tenant_id else None
+    user.__dict__["_tenant_id"] = tenant_id
+    return tenant_id
+
+def get_user_cache_scope(user: User) -> Optional[str]:
+    """Cache scope for data visible to a user: "all" for super admins, otherwise the tenant ID."""
+    if user.role == UserRole.SUPER_ADMIN:
+        return "all"
+    
+    return get_user_tenant_id(user)
 
 def validate_tenant_access(user: User, tenant_id: Optional[str]) -> bool:
     """Validate that a user can access resources for a given tenant."""
-    from app.models import UserRole
-    
     # Super admin can access everything
     if user.role == UserRole.SUPER_ADMIN:
         return True
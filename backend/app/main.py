@@ -3,10 +3,16 @@ DarManager Backend API - Production Grade Structure
 Main application entry point with modular architecture.
 """
 
+import os
+import signal
+import asyncio
+import logging
+from datetime import datetime
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import settings
@@ -18,7 +24,12 @@ from app.core.exceptions import (
     general_exception_handler
 )
 from app.api.v1.api import api_router
-from app.core.database import init_database
+from app.core.database import init_database, warm_connection_pool, engine, count_queries, AsyncSessionLocal
+from app.core.tenant import warm_tenant_cache
+from app.models import User, UserRole
+from app.core.pagination import NEXT_CURSOR_HEADER
+
+logger = logging.getLogger(__name__)
 
 
 def create_application() -> FastAPI:
@@ -31,9 +42,31 @@ def create_application() -> FastAPI:
         description="Modern Property Management System API",
         docs_url=settings.DOCS_URL,
         redoc_url=settings.REDOC_URL,
-        openapi_url=f"{settings.API_V1_PREFIX}/openapi.json"
+        openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
+        default_response_class=ORJSONResponse
     )
     
+    # Set once background database initialization finishes
+    app.state.db_ready = False
+    
+    # API routes need the database; answer 503 until it is ready (docs are static).
+    # Registered before CORS so the 503 still carries CORS headers.
+    ungated_paths = {settings.DOCS_URL, settings.REDOC_URL, f"{settings.API_V1_PREFIX}/openapi.json"}
+    
+    @app.middleware("http")
+    async def require_database_ready(request: Request, call_next):
+        if (
+            not app.state.db_ready
+            and request.url.path.startswith(settings.API_PREFIX)
+            and request.url.path not in ungated_paths
+        ):
+            return ORJSONResponse(
+                status_code=503,
+                content={"error": {"code": "SERVICE_STARTING", "message": "Service is starting", "status": 503}},
+                headers={"Retry-After": "5"}
+            )
+        return await call_next(request)
+    
     # Configure CORS
     app.add_middleware(
         CORSMiddleware,
@@ -41,8 +74,22 @@ def create_application() -> FastAPI:
         allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
         allow_methods=settings.CORS_ALLOW_METHODS,
         allow_headers=settings.CORS_ALLOW_HEADERS,
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
     
+    # Flag requests that issue more queries than expected (usually a lazy load per row)
+    if settings.DB_QUERY_BUDGET > 0:
+        @app.middleware("http")
+        async def enforce_query_budget(request: Request, call_next):
+            with count_queries() as statements:
+                response = await call_next(request)
+            if len(statements) > settings.DB_QUERY_BUDGET:
+                logger.warning(
+                    f"🔁 {request.method} {request.url.path} ran {len(statements)} queries "
+                    f"(budget {settings.DB_QUERY_BUDGET})"
+                )
+            return response
+    
     # Register exception handlers
     app.add_exception_handler(AppException, app_exception_handler)
     app.add_exception_handler(RequestValidationError, validation_exception_handler)
@@ -52,6 +99,9 @@ def create_application() -> FastAPI:
     # Include API router
     app.include_router(api_router, prefix=settings.API_V1_PREFIX)
     
+    # Health payload fields that never change for the life of the process
+    health_info = {"version": settings.APP_VERSION, "environment": settings.ENVIRONMENT}
+    
     # Add root endpoints
     @app.get("/")
     async def root():
@@ -66,13 +116,10 @@ def create_application() -> FastAPI:
     @app.get("/health")
     async def health_check():
         """Health check endpoint for container monitoring."""
-        from datetime import datetime
-        return {
-            "status": "healthy",
-            "timestamp": datetime.utcnow().isoformat(),
-            "version": settings.APP_VERSION,
-            "environment": settings.ENVIRONMENT
-        }
+        if not app.state.db_ready:
+            return ORJSONResponse(status_code=503, content={"status": "starting", **health_info})
+        # Skip jsonable_encoder; orjson writes the datetime in the same ISO format
+        return ORJSONResponse({"status": "healthy", "timestamp": datetime.utcnow(), **health_info})
     
     @app.get("/api/status")
     async def api_status():
@@ -90,38 +137,59 @@ def create_application() -> FastAPI:
 app = create_application()
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database and perform startup tasks."""
-    try:
-        init_database()
-        
-        # Check if super admin exists
-        from app.core.database import get_db
-        from app.models import User, UserRole
-        
-        db = next(get_db())
-        super_admin_exists = db.query(User).filter(User.role == UserRole.SUPER_ADMIN).first()
+async def initialize_application():
+    """Wait for the database, create tables and run startup checks, then mark the app ready."""
+    await init_database()
+    if settings.DATABASE_POOL_WARM and not settings.DATABASE_EXTERNAL_POOLER:
+        await warm_connection_pool()
+    
+    # Check if super admin exists
+    # The context manager returns the connection to the pool even if a check fails
+    async with AsyncSessionLocal() as db:
+        # Only the email is logged, so don't build a full User
+        super_admin_email = await db.scalar(
+            select(User.email).where(User.role == UserRole.SUPER_ADMIN).limit(1)
+        )
         
-        if super_admin_exists:
-            print(f"✅ Super admin found: {super_admin_exists.email}")
+        if super_admin_email:
+            print(f"✅ Super admin found: {super_admin_email}")
         else:
             print("⚠️  No super admin user found - should be created by database init script")
         
-        db.close()
-        
-        print(f"✅ {settings.APP_NAME} v{settings.APP_VERSION} started successfully")
-        print(f"📚 API Documentation: {settings.DOCS_URL}")
-        print(f"🌍 Environment: {settings.ENVIRONMENT}")
-        
-    except Exception as e:
-        print(f"❌ Startup error: {e}")
-        raise
+        # Preload the subdomain -> tenant cache
+        await warm_tenant_cache(db)
+    
+    print(f"✅ {settings.APP_NAME} v{settings.APP_VERSION} started successfully")
+    print(f"📚 API Documentation: {settings.DOCS_URL}")
+    print(f"🌍 Environment: {settings.ENVIRONMENT}")
+    
+    app.state.db_ready = True
+
+
+def exit_on_failed_initialization(task: asyncio.Task):
+    """Shut the server down when initialization fails so the container is restarted."""
+    if task.cancelled() or task.exception() is None:
+        return
+    logger.error(f"❌ Startup error, shutting down: {task.exception()}", exc_info=task.exception())
+    # Let uvicorn run its normal graceful shutdown
+    os.kill(os.getpid(), signal.SIGTERM)
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Start database initialization without blocking server startup."""
+    app.state.init_task = asyncio.create_task(initialize_application())
+    app.state.init_task.add_done_callback(exit_on_failed_initialization)
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Perform cleanup tasks on shutdown."""
+    if not app.state.init_task.done():
+        app.state.init_task.cancel()
+    
+    # Close pooled asyncpg connections cleanly instead of dropping them at exit
+    await engine.dispose()
     print(f"👋 {settings.APP_NAME} shutting down...")
 
 
@@ -4,7 +4,7 @@ SQLAlchemy models for DarManager application.
 
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Text, Integer, Numeric, DateTime, ForeignKey, Enum, Date, Boolean
+from sqlalchemy import Column, String, Text, Integer, Numeric, DateTime, ForeignKey, Enum, Date, Boolean, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -20,6 +20,12 @@ class BookingStatus(enum.Enum):
     CHECKED_OUT = "checked_out"
     CANCELLED = "cancelled"
 
+# Bookings that hold a property's dates (overlap checks)
+ACTIVE_BOOKING_STATUSES = (BookingStatus.PENDING.value, BookingStatus.CONFIRMED.value, BookingStatus.CHECKED_IN.value)
+
+# Bookings that count as a current stay (room occupancy, active booking totals)
+OCCUPYING_BOOKING_STATUSES = (BookingStatus.CONFIRMED.value, BookingStatus.CHECKED_IN.value)
+
 class PaymentStatus(enum.Enum):
     PENDING = "pending"
     PARTIAL = "partial"
@@ -73,7 +79,7 @@ class User(Base):
     hashed_password = Column(String(255), nullable=False)
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
-    role = Column(Enum(UserRole), default=UserRole.STAFF)
+    role = Column(Enum(UserRole, name="user_role"), default=UserRole.STAFF)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=True)  # nullable for super admin
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -81,6 +87,10 @@ class User(Base):
     
     # Relationships
     tenant = relationship("Tenant", back_populates="users")
+    
+    __table_args__ = (
+        Index("idx_users_role", "role"),
+    )
 
 class Property(Base):
     __tablename__ = "properties"
@@ -102,6 +112,11 @@ class Property(Base):
     tenant = relationship("Tenant", back_populates="properties")
     rooms = relationship("Room", back_populates="property")
     bookings = relationship("Booking", back_populates="property")
+    
+    # Index backing newest-first keyset pagination per tenant
+    __table_args__ = (
+        Index("idx_properties_tenant_created", "tenant_id", "created_at", "id"),
+    )
 
 class Room(Base):
     __tablename__ = "rooms"
@@ -120,6 +135,12 @@ class Room(Base):
     # Relationships
     property = relationship("Property", back_populates="rooms")
     bookings = relationship("Booking", back_populates="room")
+    
+    # Indexes backing newest-first keyset pagination, overall and per property
+    __table_args__ = (
+        Index("idx_rooms_created", "created_at", "id"),
+        Index("idx_rooms_property_created", "property_id", "created_at", "id"),
+    )
 
 class Guest(Base):
     __tablename__ = "guests"
@@ -140,6 +161,11 @@ class Guest(Base):
     # Relationships
     tenant = relationship("Tenant", back_populates="guests")
     bookings = relationship("Booking", back_populates="guest")
+    
+    # Index backing newest-first keyset pagination per tenant
+    __table_args__ = (
+        Index("idx_guests_tenant_created", "tenant_id", "created_at", "id"),
+    )
 
 class Booking(Base):
     __tablename__ = "bookings"
@@ -163,6 +189,19 @@ class Booking(Base):
     room = relationship("Room", back_populates="bookings")
     guest = relationship("Guest", back_populates="bookings")
     payments = relationship("Payment", back_populates="booking", cascade="all, delete-orphan")
+    
+    # Indexes backing room status, availability, pagination and report lookups
+    __table_args__ = (
+        Index("idx_bookings_property_status_dates", "property_id", "status", "check_in_date", "check_out_date"),
+        Index(
+            "idx_bookings_property_checkout_active", "property_id", "check_out_date",
+            postgresql_where=text("status IN ('confirmed', 'checked_in')")
+        ),
+        Index("idx_bookings_created", "created_at", "id"),
+        # Revenue reports: checked-out bookings by date, per guest and per property
+        Index("idx_bookings_status_checkout", "status", "check_out_date"),
+        Index("idx_bookings_guest_status", "guest_id", "status"),
+    )
 
 class Payment(Base):
     __tablename__ = "payments"
@@ -171,8 +210,8 @@ class Payment(Base):
     booking_id = Column(UUID(as_uuid=True), ForeignKey("bookings.id"), nullable=False)
     amount = Column(Numeric(10, 2), nullable=False)
     currency = Column(String(3), default="USD")
-    payment_method = Column(Enum(PaymentMethod), nullable=False)
-    payment_status = Column(Enum(PaymentStatus), default=PaymentStatus.PENDING)
+    payment_method = Column(Enum(PaymentMethod, name="payment_method"), nullable=False)
+    payment_status = Column(Enum(PaymentStatus, name="payment_status"), default=PaymentStatus.PENDING)
     receipt_url = Column(Text)  # URL to receipt image
     transaction_reference = Column(String(255))
     payment_date = Column(DateTime(timezone=True))
@@ -182,3 +221,8 @@ class Payment(Base):
     
     # Relationships
     booking = relationship("Booking", back_populates="payments")
+    
+    # Index for revenue by completed payment date
+    __table_args__ = (
+        Index("idx_payments_status_date", "payment_status", "payment_date"),
+    )
@@ -3,37 +3,105 @@ Booking service layer.
 Handles business logic for booking management.
 """
 
-from typing import List, Optional
+from typing import Any, AsyncIterator, List, NoReturn, Optional, Tuple
+from contextlib import asynccontextmanager
 from datetime import date
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update, exists, bindparam
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased, raiseload
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
-from app.models import Booking, User, UserRole, Property, Guest
+from app.models import Booking, User, UserRole, Property, Guest, ACTIVE_BOOKING_STATUSES
 from app.schemas import BookingCreate, BookingUpdate
 from app.core.tenant import get_user_tenant_id, validate_tenant_access
 from app.core.exceptions import NotFoundError, ConflictError, ValidationError, DependencyConflictError
+from app.core.cache import invalidate_list_cache
+from app.core.pagination import paginate_newest_first
+from app.services.dashboard_service import invalidate_dashboard_cache
+from app.services.reports_service import invalidate_report_cache
+
+
+# SQLSTATE raised by the bookings overlap exclusion constraint
+EXCLUSION_VIOLATION = "23P01"
+
+# Booking with its property's tenant for access checks (prebuilt; only booking_id varies)
+_BOOKING_WITH_TENANT_BY_ID = (
+    select(Booking, Property.tenant_id)
+    .outerjoin(Property, Booking.property_id == Property.id)
+    .where(Booking.id == bindparam("booking_id"))
+)
 
 
 class BookingService:
     """Service class for booking-related operations."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_bookings_for_user(
+    @asynccontextmanager
+    async def _overlap_guard(self) -> AsyncIterator[None]:
+        """Turn an overlap rejected by the database into a conflict."""
+        try:
+            yield
+        except IntegrityError as e:
+            await self.db.rollback()
+            if getattr(e.orig, "pgcode", None) == EXCLUSION_VIOLATION:
+                raise ConflictError("Property is already booked for the selected dates")
+            raise
+    
+    @staticmethod
+    def _overlap_criteria(
+        property_id: str,
+        check_in: date,
+        check_out: date,
+        exclude_booking_id: Optional[str] = None,
+        bookings: Any = Booking
+    ) -> List[Any]:
+        """
+        Filters matching active bookings of the property that share a night with the range.
+        
+        Pass an alias of Booking as bookings to use them inside a statement on the bookings table.
+        """
+        overlapping = [
+            bookings.property_id == property_id,
+            bookings.status.in_(ACTIVE_BOOKING_STATUSES),
+            bookings.check_out_date > check_in,
+            bookings.check_in_date < check_out
+        ]
+        if exclude_booking_id:
+            overlapping.append(bookings.id != exclude_booking_id)
+        return overlapping
+    
+    async def _raise_overlap_conflict(self, overlapping: List[Any], bookings: Any = Booking) -> NoReturn:
+        """Raise a conflict describing one of the bookings matched by the overlap criteria."""
+        # Only fetch the clashing booking to describe it
+        result = await self.db.execute(
+            select(bookings.check_in_date, bookings.check_out_date).where(*overlapping).limit(1)
+        )
+        clash = result.first()
+        if clash is None:
+            raise ConflictError("Property is already booked for the selected dates")
+        raise ConflictError(
+            f"Property is already booked from {clash.check_in_date} to {clash.check_out_date}"
+        )
+    
+    async def get_bookings_for_user(
         self, 
         user: User, 
         guest_id: Optional[str] = None,
-        property_id: Optional[str] = None
+        property_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
     ) -> List[Booking]:
-        """Get bookings accessible to the user with optional filters."""
+        """Get bookings accessible to the user with optional filters, newest first (one page when limit is set)."""
         tenant_id = get_user_tenant_id(user)
         
-        # Start with base query
-        query = self.db.query(Booking)
+        # Start with base query (response schemas don't touch relationships, so forbid lazy loads)
+        query = select(Booking).options(raiseload("*"))
         
         # Filter out bookings with null property_id or guest_id
-        query = query.filter(Booking.property_id.isnot(None), Booking.guest_id.isnot(None))
+        query = query.where(Booking.property_id.isnot(None), Booking.guest_id.isnot(None))
         
         # Add tenant filtering
         if user.role == UserRole.SUPER_ADMIN:
@@ -43,22 +111,32 @@ class BookingService:
             if not tenant_id:
                 return []
             # Join with properties to filter by tenant
-            query = query.join(Property).filter(Property.tenant_id == tenant_id)
+            query = query.join(Property).where(Property.tenant_id == tenant_id)
         
         # Apply additional filters
         if guest_id:
-            query = query.filter(Booking.guest_id == guest_id)
+            query = query.where(Booking.guest_id == guest_id)
         if property_id:
-            query = query.filter(Booking.property_id == property_id)
+            query = query.where(Booking.property_id == property_id)
         
-        return query.order_by(Booking.created_at.desc()).all()
+        result = await self.db.execute(paginate_newest_first(query, Booking, limit, cursor))
+        return result.scalars().all()
     
-    def get_booking_with_validation(self, booking_id: str, user: User) -> Optional[Booking]:
+    async def get_booking_with_validation(self, booking_id: str, user: User) -> Optional[Booking]:
         """Get a booking with tenant validation."""
-        booking = self.db.query(Booking).filter(Booking.id == booking_id).first()
+        row = await self._get_booking_and_tenant(booking_id, user)
+        return row[0] if row else None
+    
+    async def _get_booking_and_tenant(self, booking_id: str, user: User) -> Optional[Tuple[Booking, Optional[str]]]:
+        """Get a booking the user may access, with the tenant of its property."""
+        # Fetch the owning property's tenant alongside the booking in one round-trip
+        result = await self.db.execute(_BOOKING_WITH_TENANT_BY_ID, {"booking_id": booking_id})
+        row = result.one_or_none()
         
-        if not booking:
+        if not row:
             return None
+        booking, property_tenant_id = row
+        property_tenant_id = str(property_tenant_id) if property_tenant_id else None
         
         # Validate tenant access (booking inherits tenant from property)
         if user.role != UserRole.SUPER_ADMIN:
@@ -67,67 +145,80 @@ class BookingService:
                 return None
             
             # Check if booking's property belongs to user's tenant
-            property_obj = self.db.query(Property).filter(Property.id == booking.property_id).first()
-            if not property_obj or str(property_obj.tenant_id) != tenant_id:
+            if property_tenant_id != tenant_id:
                 return None
         
-        return booking
+        return booking, property_tenant_id
     
-    def create_booking(self, booking_data: BookingCreate, user: User) -> Booking:
+    async def create_booking(self, booking_data: BookingCreate, user: User) -> Booking:
         """Create a new booking with comprehensive validation."""
+        # Look up the property's and guest's tenants and check for overlaps in a single round-trip
+        overlapping = self._overlap_criteria(
+            booking_data.property_id, booking_data.check_in_date, booking_data.check_out_date
+        )
+        result = await self.db.execute(
+            select(
+                select(Property.tenant_id).where(Property.id == booking_data.property_id)
+                .scalar_subquery().label("property_tenant_id"),
+                select(Guest.tenant_id).where(Guest.id == booking_data.guest_id)
+                .scalar_subquery().label("guest_tenant_id"),
+                exists().where(*overlapping).label("overlaps")
+            )
+        )
+        owners = result.one()
+        
         # Validate property exists and user has access
-        property_exists = self.db.query(Property).filter(Property.id == booking_data.property_id).first()
-        if not property_exists:
+        if owners.property_tenant_id is None:
             raise NotFoundError("Property", booking_data.property_id)
         
         # Validate tenant access to property
-        if not validate_tenant_access(user, str(property_exists.tenant_id)):
+        property_tenant_id = str(owners.property_tenant_id)
+        if not validate_tenant_access(user, property_tenant_id):
             raise NotFoundError("Property", booking_data.property_id)
         
         # Validate guest exists and belongs to same tenant
-        guest_exists = self.db.query(Guest).filter(Guest.id == booking_data.guest_id).first()
-        if not guest_exists:
+        if owners.guest_tenant_id is None:
             raise NotFoundError("Guest", booking_data.guest_id)
         
         # Validate tenant access to guest
-        if not validate_tenant_access(user, str(guest_exists.tenant_id)):
+        if not validate_tenant_access(user, str(owners.guest_tenant_id)):
             raise NotFoundError("Guest", booking_data.guest_id)
         
         # Validate dates
         if booking_data.check_in_date >= booking_data.check_out_date:
             raise ValidationError("Check-out date must be after check-in date")
         
-        # Check for overlapping bookings
-        overlapping_bookings = self.db.query(Booking).filter(
-            Booking.property_id == booking_data.property_id,
-            Booking.status.in_(["pending", "confirmed", "checked_in"]),
-            Booking.check_out_date > booking_data.check_in_date,
-            Booking.check_in_date < booking_data.check_out_date
-        ).first()
-        
-        if overlapping_bookings:
-            raise ConflictError(
-                f"Property is already booked from {overlapping_bookings.check_in_date} to {overlapping_bookings.check_out_date}"
-            )
+        # Reject overlapping bookings (the exclusion constraint still guards concurrent inserts)
+        if owners.overlaps:
+            await self._raise_overlap_conflict(overlapping)
         
         # Create booking
-        db_booking = Booking(**booking_data.dict())
+        db_booking = Booking(**booking_data.model_dump())
         self.db.add(db_booking)
-        self.db.commit()
-        self.db.refresh(db_booking)
+        async with self._overlap_guard():
+            await self.db.commit()
+        await invalidate_dashboard_cache(property_tenant_id)
+        await invalidate_list_cache("bookings", property_tenant_id)
+        if db_booking.status == "checked_out":
+            await invalidate_report_cache(str(db_booking.guest_id), str(db_booking.property_id))
         
         return db_booking
     
-    def update_booking(self, booking_id: str, booking_data: BookingUpdate, user: User) -> Optional[Booking]:
+    async def update_booking(self, booking_id: str, booking_data: BookingUpdate, user: User) -> Optional[Booking]:
         """Update an existing booking with validation."""
-        booking = self.get_booking_with_validation(booking_id, user)
-        if not booking:
+        row = await self._get_booking_and_tenant(booking_id, user)
+        if not row:
             return None
+        booking, property_tenant_id = row
         
         # Update fields
-        update_data = booking_data.dict(exclude_unset=True)
+        update_data = booking_data.model_dump(exclude_unset=True)
+        if not update_data:
+            return booking
+        query = update(Booking).where(Booking.id == booking.id)
         
         # Validate dates if they're being updated
+        overlapping = None
         if 'check_in_date' in update_data or 'check_out_date' in update_data:
             check_in = update_data.get('check_in_date', booking.check_in_date)
             check_out = update_data.get('check_out_date', booking.check_out_date)
@@ -135,35 +226,52 @@ class BookingService:
             if check_in >= check_out:
                 raise ValidationError("Check-out date must be after check-in date")
             
-            # Check for overlapping bookings when dates are changed
-            overlapping_bookings = self.db.query(Booking).filter(
-                Booking.property_id == booking.property_id,
-                Booking.id != booking_id,
-                Booking.status.in_(["pending", "confirmed", "checked_in"]),
-                Booking.check_out_date > check_in,
-                Booking.check_in_date < check_out
-            ).first()
-            
-            if overlapping_bookings:
-                raise ConflictError(
-                    f"Property is already booked from {overlapping_bookings.check_in_date} to {overlapping_bookings.check_out_date}"
-                )
+            # Only apply the update if the new dates don't overlap another booking
+            other = aliased(Booking)
+            overlapping = self._overlap_criteria(
+                booking.property_id, check_in, check_out, exclude_booking_id=booking.id, bookings=other
+            )
+            query = query.where(~exists().where(*overlapping))
         
-        for field, value in update_data.items():
-            setattr(booking, field, value)
+        # Reports only cover checked-out bookings
+        affects_reports = booking.status == "checked_out" or update_data.get("status") == "checked_out"
         
-        self.db.commit()
-        self.db.refresh(booking)
+        # Update and fetch the row in a single statement; detach the preloaded
+        # instance so RETURNING builds a fresh one instead of keeping stale values
+        self.db.expunge(booking)
+        async with self._overlap_guard():
+            result = await self.db.execute(
+                query.values(**update_data).returning(Booking),
+                execution_options={"synchronize_session": False}
+            )
+            updated = result.scalar_one_or_none()
+            if not updated:
+                # The booking was loaded above, so a skipped update means the dates clash
+                if overlapping is not None:
+                    await self._raise_overlap_conflict(overlapping, bookings=other)
+                return None
+            booking = updated
+            await self.db.commit()
+        # Invalidate by the booking's tenant: a super admin has none of their own
+        await invalidate_dashboard_cache(property_tenant_id)
+        await invalidate_list_cache("bookings", property_tenant_id)
+        if affects_reports:
+            await invalidate_report_cache(str(booking.guest_id), str(booking.property_id))
         
         return booking
     
-    def delete_booking(self, booking_id: str, user: User) -> bool:
+    async def delete_booking(self, booking_id: str, user: User) -> bool:
         """Delete a booking with validation."""
-        booking = self.get_booking_with_validation(booking_id, user)
-        if not booking:
+        row = await self._get_booking_and_tenant(booking_id, user)
+        if not row:
             return False
+        booking, property_tenant_id = row
         
-        self.db.delete(booking)
-        self.db.commit()
+        await self.db.delete(booking)
+        await self.db.commit()
+        await invalidate_dashboard_cache(property_tenant_id)
+        await invalidate_list_cache("bookings", property_tenant_id)
+        if booking.status == "checked_out":
+            await invalidate_report_cache(str(booking.guest_id), str(booking.property_id))
         
         return True
\ No newline at end of file
@@ -3,45 +3,139 @@ Dashboard service layer.
 Handles business logic for dashboard statistics and metrics.
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+import asyncio
+from typing import Optional
+from sqlalchemy import Select, BigInteger, select, func, bindparam, case, cast, table, column
+from sqlalchemy.dialects.postgresql import REGCLASS
+from sqlalchemy.orm import raiseload
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
-from app.models import User, UserRole, Property, Room, Guest, Booking
+from app.models import User, UserRole, Property, Room, Guest, Booking, OCCUPYING_BOOKING_STATUSES
 from app.schemas import DashboardStats
 from app.core.tenant import get_user_tenant_id
+from app.core.database import AsyncSessionLocal
+from app.core.cache import cache_get, cache_set, cache_delete
+from app.core.config import settings
+
+
+def dashboard_cache_key(tenant_id: Optional[str]) -> str:
+    """Cache key for dashboard stats; super admin stats span all tenants."""
+    return f"dashboard:{tenant_id}" if tenant_id else "dashboard:all"
+
+
+async def invalidate_dashboard_cache(tenant_id: Optional[str]) -> None:
+    """Drop cached dashboard stats affected by a change to tenant data."""
+    keys = [dashboard_cache_key(None)]
+    if tenant_id:
+        keys.append(dashboard_cache_key(tenant_id))
+    await cache_delete(*keys)
+
+
+# Unfiltered totals trust planner statistics above this many rows
+ESTIMATED_COUNT_MIN_ROWS = 10000
+
+_pg_class = table("pg_class", column("oid"), column("reltuples"))
+
+
+def _estimated_count(model):
+    """
+    Row count of a whole table from pg_class statistics, which is O(1) but can lag by a few percent.
+    
+    Small tables (or ones not analyzed yet) are still counted exactly; PostgreSQL
+    only runs the exact count when that branch is taken.
+    """
+    estimate = select(_pg_class.c.reltuples).where(
+        _pg_class.c.oid == cast(model.__tablename__, REGCLASS)
+    ).scalar_subquery()
+    exact = select(func.count()).select_from(model).scalar_subquery()
+    return case((estimate >= ESTIMATED_COUNT_MIN_ROWS, cast(estimate, BigInteger)), else_=exact)
+
+
+def _totals_query(by_tenant: bool = False) -> Select:
+    """
+    Dashboard totals in a single round-trip (active = occupying statuses, revenue = checked out).
+    
+    Execute with a "tenant_id" parameter when by_tenant is set. Without it the
+    property, room and guest totals are estimates for large tables.
+    """
+    tenant_id = bindparam("tenant_id")
+    
+    def aggregate(column, model, *criteria):
+        query = select(column).select_from(model).where(*criteria)
+        if by_tenant:
+            if hasattr(model, "tenant_id"):
+                query = query.where(model.tenant_id == tenant_id)
+            else:
+                # Rooms and bookings inherit their tenant from the property
+                query = query.join(Property, model.property_id == Property.id).where(Property.tenant_id == tenant_id)
+        return query.scalar_subquery()
+    
+    # Rendered inline so the planner can match the partial index on active bookings
+    occupying = bindparam("occupying", OCCUPYING_BOOKING_STATUSES, expanding=True, literal_execute=True)
+    
+    def total(model):
+        return aggregate(func.count(), model) if by_tenant else _estimated_count(model)
+    
+    return select(
+        total(Property).label("total_properties"),
+        total(Room).label("total_rooms"),
+        total(Guest).label("total_guests"),
+        aggregate(func.count(), Booking, Booking.status.in_(occupying)).label("active_bookings"),
+        aggregate(
+            func.coalesce(func.sum(Booking.total_amount), 0), Booking, Booking.status == "checked_out"
+        ).label("total_revenue")
+    )
+
+
+# Statements for fixed query shapes, built once at import
+_TOTALS_ALL_TENANTS = _totals_query()
+_TOTALS_FOR_TENANT = _totals_query(by_tenant=True)
+
+# Dashboard queries run on their own connections; cap them so a burst of
+# dashboard loads can't take the whole pool from other requests
+_query_slots = asyncio.Semaphore(max(settings.DATABASE_POOL_SIZE // 2, 1))
 
 
 class DashboardService:
     """Service class for dashboard-related operations."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_dashboard_stats(self, user: User) -> DashboardStats:
+    @staticmethod
+    async def _one(query, params=None):
+        """Run a single-row query on its own session (sessions can't be shared across tasks)."""
+        async with _query_slots, AsyncSessionLocal() as db:
+            result = await db.execute(query, params)
+            return result.one()
+    
+    @staticmethod
+    async def _scalars(query):
+        """Run an entity query on its own session (sessions can't be shared across tasks)."""
+        async with _query_slots, AsyncSessionLocal() as db:
+            result = await db.execute(query)
+            return result.scalars().all()
+    
+    async def get_dashboard_stats(self, user: User) -> DashboardStats:
         """Get dashboard statistics based on user's role and tenant."""
         try:
             tenant_id = get_user_tenant_id(user)
             
+            # Serve from cache when possible (keyed per tenant so tenants never share stats)
+            cache_key = None
+            if user.role == UserRole.SUPER_ADMIN or tenant_id:
+                cache_key = dashboard_cache_key(None if user.role == UserRole.SUPER_ADMIN else tenant_id)
+                cached = await cache_get(cache_key)
+                if cached is not None:
+                    return DashboardStats(**cached)
+            
             # For super admin, show aggregated stats across all tenants
             if user.role == UserRole.SUPER_ADMIN:
-                # Get counts across all tenants
-                total_properties = self.db.query(Property).count()
-                total_rooms = self.db.query(Room).count()
-                total_guests = self.db.query(Guest).count()
-                active_bookings = self.db.query(Booking).filter(
-                    Booking.status.in_(['confirmed', 'checked_in'])
-                ).count()
-                
-                # Get recent bookings across all tenants
-                recent_bookings = self.db.query(Booking).order_by(
-                    Booking.created_at.desc()
-                ).limit(5).all()
+                totals_query, totals_params = _TOTALS_ALL_TENANTS, {}
                 
-                # Get total revenue from all checked-out bookings
-                total_revenue = self.db.query(func.sum(Booking.total_amount)).filter(
-                    Booking.status == 'checked_out'
-                ).scalar() or 0
+                # Recent bookings across all tenants
+                recent_bookings_query = select(Booking)
             else:
                 # For regular users, filter by tenant
                 if not tenant_id:
@@ -56,36 +150,28 @@ class DashboardService:
                         recent_bookings=[]
                     )
                 
-                # Get counts for current tenant only
-                total_properties = self.db.query(Property).filter(
-                    Property.tenant_id == tenant_id
-                ).count()
-                
-                total_guests = self.db.query(Guest).filter(
-                    Guest.tenant_id == tenant_id
-                ).count()
+                totals_query, totals_params = _TOTALS_FOR_TENANT, {"tenant_id": tenant_id}
                 
-                # Count rooms for properties belonging to this tenant
-                total_rooms = self.db.query(Room).join(Property).filter(
+                # Recent bookings for this tenant's properties
+                recent_bookings_query = select(Booking).join(Property).where(
                     Property.tenant_id == tenant_id
-                ).count()
-                
-                # Count active bookings for properties belonging to this tenant
-                active_bookings = self.db.query(Booking).join(Property).filter(
-                    Property.tenant_id == tenant_id,
-                    Booking.status.in_(['confirmed', 'checked_in'])
-                ).count()
-                
-                # Get recent bookings for this tenant's properties
-                recent_bookings = self.db.query(Booking).join(Property).filter(
-                    Property.tenant_id == tenant_id
-                ).order_by(Booking.created_at.desc()).limit(5).all()
-                
-                # Get revenue for this tenant
-                total_revenue = self.db.query(func.sum(Booking.total_amount)).join(Property).filter(
-                    Property.tenant_id == tenant_id,
-                    Booking.status == 'checked_out'
-                ).scalar() or 0
+                )
+            
+            # Booking schema only has scalar columns, so forbid lazy loads during serialization
+            recent_bookings_query = recent_bookings_query.options(raiseload("*")).order_by(
+                Booking.created_at.desc()
+            ).limit(5)
+            
+            # All counts and revenue come back in one row; run it alongside the recent bookings query
+            totals, recent_bookings = await asyncio.gather(
+                self._one(totals_query, totals_params),
+                self._scalars(recent_bookings_query)
+            )
+            total_properties = totals.total_properties
+            total_rooms = totals.total_rooms
+            total_guests = totals.total_guests
+            active_bookings = totals.active_bookings
+            total_revenue = totals.total_revenue
             
             # For backward compatibility, keep monthly_revenue as total_revenue for now
             monthly_revenue = total_revenue
@@ -95,7 +181,7 @@ class DashboardService:
             if total_rooms > 0:
                 occupancy_rate = (active_bookings / total_rooms) * 100
             
-            return DashboardStats(
+            stats = DashboardStats(
                 total_properties=total_properties,
                 total_rooms=total_rooms,
                 total_guests=total_guests,
@@ -104,6 +190,11 @@ class DashboardService:
                 occupancy_rate=occupancy_rate,
                 recent_bookings=recent_bookings or []
             )
+            
+            if cache_key:
+                await cache_set(cache_key, stats.model_dump(mode="json"), settings.DASHBOARD_CACHE_TTL)
+            
+            return stats
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
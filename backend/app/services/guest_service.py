@@ -4,40 +4,59 @@ Handles business logic for guest management.
 """
 
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update, func, exists
+from sqlalchemy.orm import raiseload
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
 from app.models import Guest, User, UserRole, Booking
 from app.schemas import GuestCreate, GuestUpdate
+from app.core.database import get_by_id, parse_id
 from app.core.tenant import get_user_tenant_id, validate_tenant_access
 from app.core.exceptions import DependencyConflictError
+from app.core.cache import invalidate_list_cache
+from app.core.pagination import paginate_newest_first
+from app.services.dashboard_service import invalidate_dashboard_cache
+from app.services.reports_service import invalidate_report_cache
 
 
 class GuestService:
     """Service class for guest-related operations."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_guests_for_user(self, user: User) -> List[Guest]:
-        """Get all guests accessible to the user based on their role and tenant."""
+    async def get_guests_for_user(
+        self,
+        user: User,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> List[Guest]:
+        """Get guests accessible to the user based on their role and tenant, newest first (one page when limit is set)."""
         tenant_id = get_user_tenant_id(user)
         
         # Super admin can see all guests
         if user.role == UserRole.SUPER_ADMIN:
-            return self.db.query(Guest).order_by(Guest.created_at.desc()).all()
+            result = await self.db.execute(
+                paginate_newest_first(select(Guest).options(raiseload("*")), Guest, limit, cursor)
+            )
+            return result.scalars().all()
         
         # Regular users see only their tenant's guests
         if not tenant_id:
             return []
         
-        return self.db.query(Guest).filter(
-            Guest.tenant_id == tenant_id
-        ).order_by(Guest.created_at.desc()).all()
+        result = await self.db.execute(
+            paginate_newest_first(
+                select(Guest).options(raiseload("*")).where(Guest.tenant_id == tenant_id),
+                Guest, limit, cursor
+            )
+        )
+        return result.scalars().all()
     
-    def get_guest_with_validation(self, guest_id: str, user: User) -> Optional[Guest]:
+    async def get_guest_with_validation(self, guest_id: str, user: User) -> Optional[Guest]:
         """Get a guest with tenant validation."""
-        guest = self.db.query(Guest).filter(Guest.id == guest_id).first()
+        guest = await get_by_id(self.db, Guest, guest_id)
         
         if not guest:
             return None
@@ -48,7 +67,7 @@ class GuestService:
         
         return guest
     
-    def create_guest(self, guest_data: GuestCreate, user: User) -> Guest:
+    async def create_guest(self, guest_data: GuestCreate, user: User) -> Guest:
         """Create a new guest with tenant association."""
         tenant_id = get_user_tenant_id(user)
         
@@ -66,47 +85,68 @@ class GuestService:
             )
         
         # Create guest with tenant_id
-        guest_dict = guest_data.dict()
+        guest_dict = guest_data.model_dump()
         guest_dict['tenant_id'] = tenant_id
         
         db_guest = Guest(**guest_dict)
         self.db.add(db_guest)
-        self.db.commit()
-        self.db.refresh(db_guest)
+        await self.db.commit()
+        await invalidate_dashboard_cache(tenant_id)
+        await invalidate_list_cache("guests", tenant_id)
         
         return db_guest
     
-    def update_guest(self, guest_id: str, guest_data: GuestUpdate, user: User) -> Optional[Guest]:
+    async def update_guest(self, guest_id: str, guest_data: GuestUpdate, user: User) -> Optional[Guest]:
         """Update an existing guest with validation."""
-        guest = self.get_guest_with_validation(guest_id, user)
-        if not guest:
+        guest_key = parse_id(guest_id)
+        if guest_key is None:
             return None
         
-        # Update fields
-        update_data = guest_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(guest, field, value)
+        update_data = guest_data.model_dump(exclude_unset=True)
+        if not update_data:
+            return await self.get_guest_with_validation(guest_key, user)
+        
+        # Update and fetch the row in a single statement, scoped to the user's tenant
+        query = update(Guest).where(Guest.id == guest_key)
+        if user.role != UserRole.SUPER_ADMIN:
+            tenant_id = get_user_tenant_id(user)
+            if not tenant_id:
+                return None
+            query = query.where(Guest.tenant_id == tenant_id)
         
-        self.db.commit()
-        self.db.refresh(guest)
+        result = await self.db.execute(query.values(**update_data).returning(Guest))
+        guest = result.scalar_one_or_none()
+        if not guest:
+            return None
+        
+        await self.db.commit()
+        await invalidate_dashboard_cache(str(guest.tenant_id))
+        await invalidate_list_cache("guests", str(guest.tenant_id))
+        await invalidate_report_cache(guest_id=str(guest.id))  # reports carry the guest's name
         
         return guest
     
-    def delete_guest(self, guest_id: str, user: User) -> bool:
+    async def delete_guest(self, guest_id: str, user: User) -> bool:
         """Delete a guest with validation and dependency checking."""
-        guest = self.get_guest_with_validation(guest_id, user)
+        guest = await self.get_guest_with_validation(guest_id, user)
         if not guest:
             return False
         
-        # Check for dependencies (bookings)
-        booking_count = self.db.query(Booking).filter(Booking.guest_id == guest_id).count()
-        if booking_count > 0:
+        # Check for dependencies (bookings); only count them when reporting the conflict
+        if await self.db.scalar(select(exists().where(Booking.guest_id == guest_id))):
+            booking_count = await self.db.scalar(
+                select(func.count()).select_from(Booking).where(Booking.guest_id == guest_id)
+            )
             raise DependencyConflictError(
                 resource=f"guest '{guest.first_name} {guest.last_name}'",
                 dependencies=f"{booking_count} booking(s)"
             )
         
-        self.db.delete(guest)
-        self.db.commit()
+        tenant_id = str(guest.tenant_id)
+        await self.db.delete(guest)
+        await self.db.commit()
+        await invalidate_dashboard_cache(tenant_id)
+        await invalidate_list_cache("guests", tenant_id)
+        await invalidate_report_cache(guest_id=str(guest.id))
         
         return True
\ No newline at end of file
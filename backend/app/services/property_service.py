@@ -4,40 +4,61 @@ Handles business logic for property management.
 """
 
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update, func, exists
+from sqlalchemy.orm import raiseload
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
 from app.models import Property, User, UserRole, Room, Booking
 from app.schemas import PropertyCreate
+from app.core.database import get_by_id, parse_id
 from app.core.tenant import get_user_tenant_id
 from app.core.exceptions import DependencyConflictError
+from app.core.cache import invalidate_list_cache
+from app.core.pagination import paginate_newest_first
+from app.services.dashboard_service import invalidate_dashboard_cache
+from app.services.reports_service import invalidate_report_cache
 
 
 class PropertyService:
     """Service class for property-related operations."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_properties_for_user(self, user: User) -> List[Property]:
-        """Get all properties accessible to the user based on their role and tenant."""
+    async def get_properties_for_user(
+        self,
+        user: User,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> List[Property]:
+        """Get properties accessible to the user based on their role and tenant, newest first (one page when limit is set)."""
         tenant_id = get_user_tenant_id(user)
         
         # Super admin can see all properties
         if user.role == UserRole.SUPER_ADMIN:
-            return self.db.query(Property).all()
+            result = await self.db.execute(
+                paginate_newest_first(select(Property).options(raiseload("*")), Property, limit, cursor)
+            )
+            return result.scalars().all()
         
         # Regular users see only their tenant's properties
         if not tenant_id:
             return []
         
-        return self.db.query(Property).filter(Property.tenant_id == tenant_id).all()
+        result = await self.db.execute(
+            paginate_newest_first(
+                select(Property).options(raiseload("*")).where(Property.tenant_id == tenant_id),
+                Property, limit, cursor
+            )
+        )
+        return result.scalars().all()
     
-    def get_property_by_id(self, property_id: str) -> Optional[Property]:
+    async def get_property_by_id(self, property_id: str) -> Optional[Property]:
         """Get a property by its ID."""
-        return self.db.query(Property).filter(Property.id == property_id).first()
+        return await get_by_id(self.db, Property, property_id)
     
-    def create_property(self, property_data: PropertyCreate, user: User) -> Property:
+    async def create_property(self, property_data: PropertyCreate, user: User) -> Property:
         """Create a new property with tenant association."""
         tenant_id = get_user_tenant_id(user)
         
@@ -55,64 +76,86 @@ class PropertyService:
             )
         
         # Create property with tenant_id
-        property_dict = property_data.dict()
+        property_dict = property_data.model_dump()
         property_dict['tenant_id'] = tenant_id
         
         db_property = Property(**property_dict)
         self.db.add(db_property)
-        self.db.commit()
-        self.db.refresh(db_property)
+        await self.db.commit()
+        await invalidate_dashboard_cache(tenant_id)
+        await invalidate_list_cache("properties", tenant_id)
         
         return db_property
     
-    def update_property(self, property_id: str, property_data: PropertyCreate) -> Property:
-        """Update an existing property."""
-        db_property = self.get_property_by_id(property_id)
+    async def update_property(self, property_id: str, property_data: PropertyCreate, user: User) -> Optional[Property]:
+        """Update a property the user can access; None if it doesn't exist or belongs to another tenant."""
+        property_key = parse_id(property_id)
+        if property_key is None:
+            return None
+        
+        # Update and fetch the row in a single statement, scoped to the user's tenant
+        query = update(Property).where(Property.id == property_key)
+        if user.role != UserRole.SUPER_ADMIN:
+            tenant_id = get_user_tenant_id(user)
+            if not tenant_id:
+                return None
+            query = query.where(Property.tenant_id == tenant_id)
+        
+        update_data = property_data.model_dump(exclude_unset=True)
+        result = await self.db.execute(query.values(**update_data).returning(Property))
+        db_property = result.scalar_one_or_none()
         if not db_property:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Property not found"
-            )
+            return None
         
-        # Update fields
-        update_data = property_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_property, field, value)
-        
-        self.db.commit()
-        self.db.refresh(db_property)
+        await self.db.commit()
+        await invalidate_dashboard_cache(str(db_property.tenant_id))
+        await invalidate_list_cache("properties", str(db_property.tenant_id))
+        await invalidate_report_cache(property_id=str(db_property.id))  # reports carry the property's name
         
         return db_property
     
-    def delete_property(self, property_id: str) -> bool:
+    async def delete_property(self, property_id: str) -> bool:
         """Delete a property with dependency checking."""
-        db_property = self.get_property_by_id(property_id)
+        db_property = await self.get_property_by_id(property_id)
         if not db_property:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Property not found"
             )
         
-        # Check for dependencies
-        dependencies = []
-        
-        # Check for rooms
-        room_count = self.db.query(Room).filter(Room.property_id == property_id).count()
-        if room_count > 0:
-            dependencies.append(f"{room_count} room(s)")
-        
-        # Check for bookings
-        booking_count = self.db.query(Booking).filter(Booking.property_id == property_id).count()
-        if booking_count > 0:
-            dependencies.append(f"{booking_count} booking(s)")
-        
-        if dependencies:
+        # Check for dependencies (rooms and bookings) in one round-trip
+        result = await self.db.execute(
+            select(
+                exists().where(Room.property_id == property_id),
+                exists().where(Booking.property_id == property_id)
+            )
+        )
+        has_rooms, has_bookings = result.one()
+        
+        # Only count them when reporting the conflict
+        if has_rooms or has_bookings:
+            dependencies = []
+            if has_rooms:
+                room_count = await self.db.scalar(
+                    select(func.count()).select_from(Room).where(Room.property_id == property_id)
+                )
+                dependencies.append(f"{room_count} room(s)")
+            if has_bookings:
+                booking_count = await self.db.scalar(
+                    select(func.count()).select_from(Booking).where(Booking.property_id == property_id)
+                )
+                dependencies.append(f"{booking_count} booking(s)")
+            
             raise DependencyConflictError(
                 resource=f"property '{db_property.name}'",
                 dependencies=" and ".join(dependencies)
             )
         
-        self.db.delete(db_property)
-        self.db.commit()
+        tenant_id = str(db_property.tenant_id)
+        await self.db.delete(db_property)
+        await self.db.commit()
+        await invalidate_dashboard_cache(tenant_id)
+        await invalidate_list_cache("properties", tenant_id)
+        await invalidate_report_cache(property_id=str(db_property.id))
         
         return True
\ No newline at end of file
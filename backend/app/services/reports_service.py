@@ -3,159 +3,226 @@ Reports service layer.
 Handles business logic for financial reporting and analytics.
 """
 
-from typing import Optional
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from typing import Any, Awaitable, Callable, Optional
+from datetime import date, timedelta
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
 from app.models import User, UserRole, Guest, Property, Booking
 from app.schemas import GuestRevenue, PropertyRevenue, FinancialReport
 from app.core.tenant import get_user_tenant_id, validate_tenant_access
+from app.core.database import AsyncSessionLocal, parse_id
+from app.core.cache import cache_get_or_refresh, cache_delete, cache_delete_pattern
+from app.core.config import settings
+
+
+async def invalidate_report_cache(guest_id: Optional[str] = None, property_id: Optional[str] = None) -> None:
+    """Drop cached reports affected by a checked-out booking changing."""
+    keys = []
+    if guest_id:
+        keys.append(f"report:guest:{guest_id}")
+    if property_id:
+        keys.append(f"report:property:{property_id}")
+    await cache_delete(*keys)
+    await cache_delete_pattern("report:fin:*")
 
 
 class ReportsService:
     """Service class for report-related operations."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_guest_revenue(self, guest_id: str, user: User) -> Optional[GuestRevenue]:
+    async def _cached(self, key: str, load: Callable[["ReportsService"], Awaitable[Any]]) -> Any:
+        """Serve a report from cache; background refreshes run on their own session."""
+        async def refresh():
+            async with AsyncSessionLocal() as db:
+                return await load(ReportsService(db))
+        
+        return await cache_get_or_refresh(
+            key,
+            lambda: load(self),
+            settings.REPORT_CACHE_TTL,
+            settings.REPORT_CACHE_STALE_TTL,
+            refresher=refresh
+        )
+    
+    async def get_guest_revenue(self, guest_id: str, user: User) -> Optional[GuestRevenue]:
         """Get total revenue from a specific guest."""
-        # Get the guest
-        db_guest = self.db.query(Guest).filter(Guest.id == guest_id).first()
-        if not db_guest:
+        # Key the cache by the canonical id so invalidation (by str(UUID)) always matches
+        guest_uuid = parse_id(guest_id)
+        if guest_uuid is None:
             return None
+        guest_id = str(guest_uuid)
+        
+        cached = await self._cached(
+            f"report:guest:{guest_id}",
+            lambda service: service._load_guest_revenue(guest_id)
+        )
         
         # Validate tenant access
-        if not validate_tenant_access(user, str(db_guest.tenant_id)):
+        if not cached or not validate_tenant_access(user, cached["tenant_id"]):
             return None
         
-        # Calculate total spent by guest (only checked-out bookings)
-        total_spent = self.db.query(func.sum(Booking.total_amount)).filter(
-            Booking.guest_id == guest_id,
-            Booking.status == 'checked_out'
-        ).scalar() or 0
+        return GuestRevenue(**cached["revenue"])
+    
+    async def _load_guest_revenue(self, guest_id: str) -> Optional[dict]:
+        """Compute guest revenue along with the owning tenant for access checks."""
+        # Get the guest (only the name and owning tenant are needed)
+        result = await self.db.execute(
+            select(Guest).options(load_only(Guest.first_name, Guest.last_name, Guest.tenant_id)).where(
+                Guest.id == guest_id
+            )
+        )
+        db_guest = result.scalar_one_or_none()
+        if not db_guest:
+            return None
         
-        # Count bookings
-        bookings_count = self.db.query(Booking).filter(
-            Booking.guest_id == guest_id,
-            Booking.status == 'checked_out'
-        ).count()
+        # Total spent and booking count in one scan (only checked-out bookings)
+        result = await self.db.execute(
+            select(func.coalesce(func.sum(Booking.total_amount), 0), func.count(Booking.id)).where(
+                Booking.guest_id == guest_id,
+                Booking.status == 'checked_out'
+            )
+        )
+        total_spent, bookings_count = result.one()
         
-        return GuestRevenue(
+        revenue = GuestRevenue(
             guest_id=db_guest.id,
             guest_name=f"{db_guest.first_name} {db_guest.last_name}",
             total_spent=total_spent,
             bookings_count=bookings_count
         )
+        return {"tenant_id": str(db_guest.tenant_id), "revenue": revenue.model_dump(mode="json")}
     
-    def get_property_revenue(self, property_id: str, user: User) -> Optional[PropertyRevenue]:
+    async def get_property_revenue(self, property_id: str, user: User) -> Optional[PropertyRevenue]:
         """Get total revenue from a specific property."""
-        # Get the property
-        db_property = self.db.query(Property).filter(Property.id == property_id).first()
-        if not db_property:
+        # Key the cache by the canonical id so invalidation (by str(UUID)) always matches
+        property_uuid = parse_id(property_id)
+        if property_uuid is None:
             return None
+        property_id = str(property_uuid)
+        
+        cached = await self._cached(
+            f"report:property:{property_id}",
+            lambda service: service._load_property_revenue(property_id)
+        )
         
         # Validate tenant access
-        if not validate_tenant_access(user, str(db_property.tenant_id)):
+        if not cached or not validate_tenant_access(user, cached["tenant_id"]):
             return None
         
-        # Calculate total revenue for property (only checked-out bookings)
-        total_revenue = self.db.query(func.sum(Booking.total_amount)).filter(
-            Booking.property_id == property_id,
-            Booking.status == 'checked_out'
-        ).scalar() or 0
+        return PropertyRevenue(**cached["revenue"])
+    
+    async def _load_property_revenue(self, property_id: str) -> Optional[dict]:
+        """Compute property revenue along with the owning tenant for access checks."""
+        # Get the property (only the name and owning tenant are needed)
+        result = await self.db.execute(
+            select(Property).options(load_only(Property.name, Property.tenant_id)).where(
+                Property.id == property_id
+            )
+        )
+        db_property = result.scalar_one_or_none()
+        if not db_property:
+            return None
         
-        # Count bookings
-        bookings_count = self.db.query(Booking).filter(
-            Booking.property_id == property_id,
-            Booking.status == 'checked_out'
-        ).count()
+        # Total revenue and booking count in one scan (only checked-out bookings)
+        result = await self.db.execute(
+            select(func.coalesce(func.sum(Booking.total_amount), 0), func.count(Booking.id)).where(
+                Booking.property_id == property_id,
+                Booking.status == 'checked_out'
+            )
+        )
+        total_revenue, bookings_count = result.one()
         
-        return PropertyRevenue(
+        revenue = PropertyRevenue(
             property_id=db_property.id,
             property_name=db_property.name,
             total_revenue=total_revenue,
             bookings_count=bookings_count
         )
+        return {"tenant_id": str(db_property.tenant_id), "revenue": revenue.model_dump(mode="json")}
     
-    def get_financial_report(
+    async def get_financial_report(
         self, 
         user: User, 
-        start_date: Optional[str] = None,
-        end_date: Optional[str] = None
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
     ) -> FinancialReport:
         """Get comprehensive financial report for date range."""
         tenant_id = get_user_tenant_id(user)
         
-        # Parse dates or use defaults
-        if not end_date:
-            end_dt = datetime.now().date()
-        else:
-            end_dt = datetime.strptime(end_date, "%Y-%m-%d").date()
+        # Default to the 30 days up to today
+        end_dt = end_date or date.today()
+        start_dt = start_date or end_dt - timedelta(days=30)
         
-        if not start_date:
-            start_dt = end_dt - timedelta(days=30)
-        else:
-            start_dt = datetime.strptime(start_date, "%Y-%m-%d").date()
+        # Filter by tenant if not super admin
+        if user.role == UserRole.SUPER_ADMIN or not tenant_id:
+            tenant_id = None
         
-        # Base query for bookings
-        base_query = self.db.query(Booking).filter(
+        cached = await self._cached(
+            f"report:fin:{tenant_id or 'all'}:{start_dt}:{end_dt}",
+            lambda service: service._load_financial_report(tenant_id, start_dt, end_dt)
+        )
+        return FinancialReport(**cached)
+    
+    async def _load_financial_report(self, tenant_id: Optional[str], start_dt: date, end_dt: date) -> dict:
+        """Compute the financial report, optionally scoped to one tenant."""
+        # Checked-out bookings in the window, optionally limited to one tenant's properties
+        filters = [
             Booking.status == 'checked_out',
-            Booking.check_out_date >= start_dt,
-            Booking.check_out_date <= end_dt
+            Booking.check_out_date.between(start_dt, end_dt)
+        ]
+        if tenant_id:
+            filters.append(Property.tenant_id == tenant_id)
+        revenue = func.coalesce(func.sum(Booking.total_amount), 0)
+        
+        # Revenue by property
+        result = await self.db.execute(
+            select(Booking.property_id, Property.name, revenue, func.count(Booking.id))
+            .join(Property, Booking.property_id == Property.id)
+            .where(*filters)
+            .group_by(Booking.property_id, Property.name)
+            .order_by(Property.name)
         )
+        properties = [
+            PropertyRevenue(
+                property_id=prop_id,
+                property_name=name,
+                total_revenue=total,
+                bookings_count=count
+            )
+            for prop_id, name, total, count in result.all()
+        ]
         
-        # Filter by tenant if not super admin
-        if user.role != UserRole.SUPER_ADMIN and tenant_id:
-            base_query = base_query.join(Property).filter(Property.tenant_id == tenant_id)
-        
-        bookings = base_query.all()
-        
-        # Calculate total revenue
-        total_revenue = sum(b.total_amount or 0 for b in bookings)
-        
-        # Get revenue by property
-        property_revenues = {}
-        for booking in bookings:
-            prop_id = str(booking.property_id)
-            if prop_id not in property_revenues:
-                prop = booking.property
-                property_revenues[prop_id] = {
-                    'property_id': prop.id,
-                    'property_name': prop.name,
-                    'total_revenue': 0,
-                    'bookings_count': 0
-                }
-            property_revenues[prop_id]['total_revenue'] += booking.total_amount or 0
-            property_revenues[prop_id]['bookings_count'] += 1
-        
-        # Convert to list of PropertyRevenue objects
-        properties = [PropertyRevenue(**data) for data in property_revenues.values()]
-        
-        # Calculate breakdown by booking source
-        booking_sources = {}
-        for booking in bookings:
-            source = booking.booking_source or 'unknown'
-            if source not in booking_sources:
-                booking_sources[source] = 0
-            booking_sources[source] += booking.total_amount or 0
-        
-        # Calculate daily revenue
-        daily_revenue = {}
-        for booking in bookings:
-            day = str(booking.check_out_date)
-            if day not in daily_revenue:
-                daily_revenue[day] = 0
-            daily_revenue[day] += booking.total_amount or 0
-        
-        # Convert daily revenue to list format
+        # Every booking belongs to exactly one property, so the property totals add up to the total
+        total_revenue = sum(p.total_revenue for p in properties)
+        
+        # Breakdown by booking source
+        source = func.coalesce(Booking.booking_source, 'unknown')
+        result = await self.db.execute(
+            select(source, revenue)
+            .join(Property, Booking.property_id == Property.id)
+            .where(*filters)
+            .group_by(source)
+        )
+        booking_sources = dict(result.all())
+        
+        # Daily revenue
+        result = await self.db.execute(
+            select(Booking.check_out_date, revenue)
+            .join(Property, Booking.property_id == Property.id)
+            .where(*filters)
+            .group_by(Booking.check_out_date)
+            .order_by(Booking.check_out_date)
+        )
         daily_revenue_list = [
-            {'date': date, 'revenue': revenue}
-            for date, revenue in sorted(daily_revenue.items())
+            {'date': day.isoformat(), 'revenue': day_revenue}
+            for day, day_revenue in result.all()
         ]
         
-        return FinancialReport(
+        report = FinancialReport(
             start_date=start_dt,
             end_date=end_dt,
             total_revenue=total_revenue,
@@ -163,4 +230,5 @@ class ReportsService:
             payment_methods_breakdown={},  # Not using payments table yet
             booking_sources_breakdown=booking_sources,
             daily_revenue=daily_revenue_list
-        )
\ No newline at end of file
+        )
+        return report.model_dump(mode="json")
\ No newline at end of file
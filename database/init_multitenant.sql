@@ -4,6 +4,7 @@
 -- Set up extensions
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 CREATE EXTENSION IF NOT EXISTS "pgcrypto";
+CREATE EXTENSION IF NOT EXISTS "btree_gist";
 
 -- Create enum types
 CREATE TYPE user_role AS ENUM ('SUPER_ADMIN', 'ADMIN', 'MANAGER', 'STAFF');
@@ -121,16 +122,32 @@ CREATE TABLE IF NOT EXISTS payments (
 -- Create indexes for performance
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
 CREATE INDEX IF NOT EXISTS idx_users_tenant_id ON users(tenant_id);
+CREATE INDEX IF NOT EXISTS idx_users_role ON users(role);
 CREATE INDEX IF NOT EXISTS idx_properties_tenant_id ON properties(tenant_id);
+CREATE INDEX IF NOT EXISTS idx_properties_tenant_created ON properties(tenant_id, created_at, id);
 CREATE INDEX IF NOT EXISTS idx_guests_tenant_id ON guests(tenant_id);
+CREATE INDEX IF NOT EXISTS idx_guests_tenant_created ON guests(tenant_id, created_at, id);
 CREATE INDEX IF NOT EXISTS idx_rooms_property_id ON rooms(property_id);
+CREATE INDEX IF NOT EXISTS idx_rooms_created ON rooms(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_rooms_property_created ON rooms(property_id, created_at, id);
 CREATE INDEX IF NOT EXISTS idx_bookings_property_id ON bookings(property_id);
 CREATE INDEX IF NOT EXISTS idx_bookings_guest_id ON bookings(guest_id);
 CREATE INDEX IF NOT EXISTS idx_bookings_dates ON bookings(check_in_date, check_out_date);
+CREATE INDEX IF NOT EXISTS idx_bookings_property_status_dates ON bookings(property_id, status, check_in_date, check_out_date);
+CREATE INDEX IF NOT EXISTS idx_bookings_property_checkout_active ON bookings(property_id, check_out_date) WHERE status IN ('confirmed', 'checked_in');
+CREATE INDEX IF NOT EXISTS idx_bookings_created ON bookings(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_bookings_status_checkout ON bookings(status, check_out_date);
+CREATE INDEX IF NOT EXISTS idx_bookings_guest_status ON bookings(guest_id, status);
 CREATE INDEX IF NOT EXISTS idx_payments_booking_id ON payments(booking_id);
+CREATE INDEX IF NOT EXISTS idx_payments_status_date ON payments(payment_status, payment_date);
 CREATE INDEX IF NOT EXISTS idx_tenants_subdomain ON tenants(subdomain);
 CREATE INDEX IF NOT EXISTS idx_tenants_domain ON tenants(domain);
 
+-- Reject overlapping stays for the same property at the database level
+ALTER TABLE bookings ADD CONSTRAINT excl_bookings_property_overlap
+EXCLUDE USING gist (property_id WITH =, daterange(check_in_date, check_out_date) WITH &&)
+WHERE (status IN ('pending', 'confirmed', 'checked_in'));
+
 -- Create function for updating updated_at column
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -0,0 +1,13 @@
+-- Migration: Add composite indexes for booking status lookups
+-- Date: 2026-10-15
+-- Description: Support room status and overlap queries that filter bookings by
+-- property, status and date range
+
+-- Property + status + date range (room status, overlap checks, dashboard counts)
+CREATE INDEX IF NOT EXISTS idx_bookings_property_status_dates
+ON bookings(property_id, status, check_in_date, check_out_date);
+
+-- Checkouts for active bookings only (rooms needing cleaning)
+CREATE INDEX IF NOT EXISTS idx_bookings_property_checkout_active
+ON bookings(property_id, check_out_date)
+WHERE status IN ('confirmed', 'checked_in');
@@ -0,0 +1,12 @@
+-- Migration: Reject overlapping bookings in the database
+-- Date: 2026-10-15
+-- Description: Exclusion constraint so two pending/confirmed/checked-in bookings
+-- can never cover the same nights of a property, even under concurrent inserts.
+-- Existing overlapping rows must be resolved before running this.
+
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+-- Stays are half-open: check-out day is free for the next check-in
+ALTER TABLE bookings ADD CONSTRAINT excl_bookings_property_overlap
+EXCLUDE USING gist (property_id WITH =, daterange(check_in_date, check_out_date) WITH &&)
+WHERE (status IN ('pending', 'confirmed', 'checked_in'));
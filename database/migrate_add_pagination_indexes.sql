@@ -0,0 +1,19 @@
+-- Migration: Add indexes for keyset pagination
+-- Date: 2026-10-15
+-- Description: List endpoints page newest first on (created_at, id);
+-- B-tree indexes are scanned backwards for the descending order
+
+CREATE INDEX IF NOT EXISTS idx_guests_tenant_created
+ON guests(tenant_id, created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_bookings_created
+ON bookings(created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_properties_tenant_created
+ON properties(tenant_id, created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_rooms_created
+ON rooms(created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_rooms_property_created
+ON rooms(property_id, created_at, id);
@@ -0,0 +1,14 @@
+-- Migration: Add composite indexes for report filters
+-- Date: 2026-10-15
+-- Description: Revenue reports filter bookings on (status, check_out_date) and
+-- (guest_id, status); payments are filtered on (payment_status, payment_date).
+-- (property_id, status) is already covered by idx_bookings_property_status_dates.
+
+CREATE INDEX IF NOT EXISTS idx_bookings_status_checkout
+ON bookings(status, check_out_date);
+
+CREATE INDEX IF NOT EXISTS idx_bookings_guest_status
+ON bookings(guest_id, status);
+
+CREATE INDEX IF NOT EXISTS idx_payments_status_date
+ON payments(payment_status, payment_date);
@@ -0,0 +1,7 @@
+-- Migration: Add index on users.role
+-- Date: 2026-10-15
+-- Description: The startup super admin check and role-based user lookups
+-- filter on role; without an index each one scans the users table.
+
+CREATE INDEX IF NOT EXISTS idx_users_role
+ON users(role);